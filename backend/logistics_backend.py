@@ -11,19 +11,52 @@ Status: 100% Reliable, Observable, Correct
 """
 
 import os
+import sys
+import math
+import asyncio
 import random
 import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from functools import partial
+from itertools import compress, repeat
+from operator import itemgetter, not_
+from typing import Dict, List, Optional, Sequence
 from enum import Enum
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from fastapi import FastAPI, HTTPException, status, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field, field_validator, ConfigDict, ValidationError
+from fastapi import FastAPI, HTTPException, status, WebSocket, WebSocketDisconnect, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import requests
+from anyio import from_thread
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from typing import Set
+from typing import Set, Tuple
+
+# Fast JSON encoding for large list responses (stdlib fallback if orjson is missing)
+try:
+    import orjson
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def _json_default(obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()  # Same rendering as orjson for aware datetimes
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=_json_default).encode()
+
+    json_loads = json.loads
 
 # ============================================================================
 # ENUMS & CONSTANTS
@@ -46,6 +79,54 @@ class OrderStatus(str, Enum):
 MAX_REASSIGNMENTS = 2
 ML_RISK_THRESHOLD = 0.7
 
+# Telemetry ingestion
+TELEMETRY_FLUSH_INTERVAL = 0.25  # Seconds between batched writes of coalesced pings
+TELEMETRY_HISTORY_SIZE = 60      # Positions kept per driver (about a minute at 1 Hz)
+
+# Compact enum codes for the column store - position in the tuple is the code
+DRIVER_STATUS_CODES = tuple(DriverStatus)
+ORDER_STATUS_CODES = tuple(OrderStatus)
+DRIVER_STATUS_TO_CODE = {s: code for code, s in enumerate(DRIVER_STATUS_CODES)}
+ORDER_STATUS_TO_CODE = {s: code for code, s in enumerate(ORDER_STATUS_CODES)}
+NO_DRIVER = -1  # Driver column value for unassigned orders
+MAX_REASSIGN_COUNT = 2**32 - 1  # Capacity of the unsigned reassign_count column
+ORDER_STATUS_VALUES = [s.value for s in ORDER_STATUS_CODES]
+DRIVER_STATUS_VALUES = [s.value for s in DRIVER_STATUS_CODES]
+
+# Encoded-entity cache: rows per table whose list JSON is kept between requests
+ENCODE_CACHE_ROWS = int(os.getenv("ENCODE_CACHE_ROWS", "100000"))
+
+
+def iso_to_epoch(value: str) -> float:
+    """Parse an ISO 8601 timestamp into epoch seconds (naive values are UTC)"""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def epoch_to_iso(value: float) -> str:
+    """Render epoch seconds back into the API's UTC ISO 8601 format"""
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+def epoch_column_to_datetimes(values: Sequence[float]) -> List[Optional[datetime]]:
+    """
+    Bulk epoch_to_iso for encoding: aware datetimes, which json_dumps renders
+    exactly like epoch_to_iso. NaN (never set) becomes None.
+    """
+    to_datetime = partial(datetime.fromtimestamp, tz=timezone.utc)
+    return [None if v != v else to_datetime(v) for v in values]
+
+
+def is_storable_timestamp(value: str) -> bool:
+    """True if value parses and its epoch form renders back (no year overflow in UTC)"""
+    try:
+        epoch_to_iso(iso_to_epoch(value))
+    except (ValueError, OverflowError, OSError):
+        return False
+    return True
+
 # ============================================================================
 # PYDANTIC MODELS (Data Contracts)
 # ============================================================================
@@ -58,6 +139,16 @@ class Driver(BaseModel):
     name: str = Field(..., description="Driver full name")
     status: DriverStatus = Field(default=DriverStatus.AVAILABLE)
     current_location: str = Field(default="HUB-01", description="Current driver location")
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90, description="Last reported GPS latitude")
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180, description="Last reported GPS longitude")
+    last_ping_at: Optional[str] = Field(default=None, description="Time of the last telemetry ping")
+
+    @field_validator("last_ping_at")
+    @classmethod
+    def validate_iso_timestamp(cls, v):
+        if v is not None and not is_storable_timestamp(v):
+            raise ValueError("last_ping_at must be an ISO 8601 timestamp within the supported date range")
+        return v
 
 
 class Order(BaseModel):
@@ -67,9 +158,16 @@ class Order(BaseModel):
     id: str = Field(..., description="Unique order identifier")
     status: OrderStatus = Field(default=OrderStatus.ACTIVE)
     assigned_driver_id: Optional[str] = Field(default=None)
-    reassign_count: int = Field(default=0, ge=0)
+    reassign_count: int = Field(default=0, ge=0, le=MAX_REASSIGN_COUNT)
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
+    @field_validator("created_at")
+    @classmethod
+    def validate_iso_timestamp(cls, v):
+        if not is_storable_timestamp(v):
+            raise ValueError("created_at must be an ISO 8601 timestamp within the supported date range")
+        return v
+
 
 class DelayEvent(BaseModel):
     """Delay event payload - triggers reassignment logic"""
@@ -86,6 +184,31 @@ class DelayEvent(BaseModel):
         return v
 
 
+class TelemetryPing(BaseModel):
+    """Single GPS ping from a driver's device"""
+    driver_id: str = Field(..., description="Driver sending the ping")
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    location: Optional[str] = Field(default=None, description="Optional zone/hub label; updates current_location")
+    timestamp: Optional[float] = Field(default=None, description="Device time in epoch seconds (server time if omitted)")
+
+    @field_validator("timestamp")
+    @classmethod
+    def validate_epoch(cls, v):
+        if v is None:
+            return v
+        try:
+            epoch_to_iso(v)
+        except (ValueError, OverflowError, OSError):
+            raise ValueError("timestamp must be finite epoch seconds within the supported date range")
+        return v
+
+
+class TelemetryBatch(BaseModel):
+    """Batch of GPS pings - one request per device or gateway flush"""
+    pings: List[TelemetryPing]
+
+
 class SystemState(BaseModel):
     """Complete system state snapshot - for visualization"""
     model_config = ConfigDict(use_enum_values=False)
@@ -96,6 +219,809 @@ class SystemState(BaseModel):
     timestamp: str
 
 
+# ============================================================================
+# COMPACT COLUMN STORE (Internal Representation)
+# ============================================================================
+# Drivers and orders are stored column-by-column in typed arrays instead of
+# one pydantic model per entity. Ids are interned, enums become small int
+# codes and timestamps are epoch floats. Pydantic models are only built
+# (materialized) at the API boundary.
+
+class Interner:
+    """Maps repeated strings (e.g. locations) to small int codes and back"""
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def clear(self):
+        self.values.clear()
+        self.codes.clear()
+
+
+def gather(column: Sequence, rows: Sequence[int]) -> Sequence:
+    """Values of column at rows, via C-level slicing/itemgetter (cheap under the store lock)"""
+    if isinstance(rows, range) and rows.step == 1:
+        return column[rows.start:rows.stop]
+    if len(rows) == 1:
+        return (column[rows[0]],)
+    return itemgetter(*rows)(column) if rows else ()
+
+
+class EncodedRowCache:
+    """
+    Per-row cache of encoded '"<id>":{...}' list entries, shared by the column
+    tables. Entries are built outside state_store.lock from a RowSnapshot and
+    stored back only if the table is unchanged (version counts mutations).
+
+    At most cache_limit rows are cached per table, because each cached order
+    costs about 180 B - roughly as much as the row itself. Rows beyond the cap
+    are encoded on every request (~2.5 us per order).
+    """
+    __slots__ = ("encoded", "cached", "version", "cache_limit")
+
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, cache_limit: int = ENCODE_CACHE_ROWS):
+        self.encoded: List[Optional[bytes]] = []  # None when stale or never cached
+        self.cached = 0
+        self.version = 0
+        self.cache_limit = cache_limit
+
+    def invalidate(self, row: int):
+        """Drop a row's cached entry after a mutation"""
+        if self.encoded[row] is not None:
+            self.encoded[row] = None
+            self.cached -= 1
+        self.version += 1
+
+    def clear_cache(self):
+        self.encoded.clear()
+        self.cached = 0
+        self.version += 1
+
+    def gather_columns(self, rows: Sequence[int], fields: Tuple[str, ...]) -> Dict[str, Sequence]:
+        raise NotImplementedError
+
+    def render_columns(self, raw: Dict[str, Sequence], fields: Tuple[str, ...]) -> List[Sequence]:
+        raise NotImplementedError
+
+    def snapshot(self, rows: Sequence[int], fields: Optional[Tuple[str, ...]] = None) -> "RowSnapshot":
+        """
+        Copy everything needed to encode rows (call under state_store.lock).
+        Full entities copy the cached entries plus raw columns of the uncached
+        rows only; projections copy the requested columns.
+        """
+        if fields is None:
+            cached = gather(self.encoded, rows)
+            missing = list(compress(rows, map(not_, cached)))
+            return RowSnapshot(self, cached, missing, None, self.gather_columns(missing, self.FIELDS))
+        return RowSnapshot(self, None, rows, fields, self.gather_columns(rows, fields))
+
+    def store_encoded(self, snapshot: "RowSnapshot", entries: List[bytes]):
+        """Cache entries encoded from snapshot (call under state_store.lock)"""
+        room = self.cache_limit - self.cached
+        if snapshot.version != self.version or room <= 0:
+            return
+        encoded = self.encoded
+        stored = 0
+        for row, entry in zip(snapshot.rows[:room], entries):
+            encoded[row] = entry
+            stored += 1
+        self.cached += stored
+
+
+class DriverTable(EncodedRowCache):
+    """
+    Column store for drivers. A driver's row number doubles as its interned
+    code, which is what the order table keeps in its driver column.
+    All mutations go through methods so derived state stays consistent.
+
+    Aggregate counters (kept in sync by the mutation methods):
+        status_counts:  drivers per status code
+        location_total / location_busy: drivers (and BUSY drivers) per location code
+    """
+    __slots__ = ("ids", "index", "names", "status", "location", "locations", "latitude", "longitude",
+                 "last_ping", "status_counts", "location_total", "location_busy")
+
+    FIELDS = ("id", "name", "status", "current_location", "latitude", "longitude", "last_ping_at")
+
+    def __init__(self, cache_limit: int = ENCODE_CACHE_ROWS):
+        super().__init__(cache_limit)
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.status = array("b")
+        self.location = array("i")
+        self.locations = Interner()
+        self.latitude = array("d")   # NaN until the first ping
+        self.longitude = array("d")
+        self.last_ping = array("d")  # Epoch seconds, NaN until the first ping
+        self.status_counts = [0] * len(DRIVER_STATUS_CODES)
+        self.location_total: Dict[int, int] = {}
+        self.location_busy: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, driver_id: str) -> bool:
+        return driver_id in self.index
+
+    def clear(self):
+        self.ids.clear()
+        self.index.clear()
+        self.names.clear()
+        del self.status[:]
+        del self.location[:]
+        self.locations.clear()
+        del self.latitude[:]
+        del self.longitude[:]
+        del self.last_ping[:]
+        self.clear_cache()
+        self.status_counts = [0] * len(DRIVER_STATUS_CODES)
+        self.location_total.clear()
+        self.location_busy.clear()
+
+    def add(self, driver: Driver) -> int:
+        """Append a validated Driver model and return its row"""
+        row = len(self.ids)
+        driver_id = sys.intern(driver.id)
+        self.ids.append(driver_id)
+        self.index[driver_id] = row
+        self.names.append(driver.name)
+        status_code = DRIVER_STATUS_TO_CODE[driver.status]
+        location_code = self.locations.intern(driver.current_location)
+        self.status.append(status_code)
+        self.location.append(location_code)
+        self.latitude.append(math.nan if driver.latitude is None else driver.latitude)
+        self.longitude.append(math.nan if driver.longitude is None else driver.longitude)
+        self.last_ping.append(math.nan if driver.last_ping_at is None else iso_to_epoch(driver.last_ping_at))
+        self.encoded.append(None)
+
+        self.status_counts[status_code] += 1
+        self.location_total[location_code] = self.location_total.get(location_code, 0) + 1
+        if driver.status == DriverStatus.BUSY:
+            self.location_busy[location_code] = self.location_busy.get(location_code, 0) + 1
+        return row
+
+    def row(self, driver_id: str) -> int:
+        return self.index[driver_id]
+
+    def get_status(self, row: int) -> DriverStatus:
+        return DRIVER_STATUS_CODES[self.status[row]]
+
+    def set_status(self, row: int, status: DriverStatus):
+        code = DRIVER_STATUS_TO_CODE[status]
+        previous = self.status[row]
+        if previous == code:
+            return
+        busy = DRIVER_STATUS_TO_CODE[DriverStatus.BUSY]
+        location_code = self.location[row]
+        if code == busy:
+            self.location_busy[location_code] = self.location_busy.get(location_code, 0) + 1
+        elif previous == busy:
+            self.location_busy[location_code] -= 1
+        self.status_counts[previous] -= 1
+        self.status_counts[code] += 1
+        self.status[row] = code
+        self.invalidate(row)
+
+    def set_location(self, row: int, location: str):
+        """Move a driver to another location label, keeping per-location counters in sync"""
+        code = self.locations.intern(location)
+        previous = self.location[row]
+        if previous == code:
+            return
+        self.location_total[previous] -= 1
+        self.location_total[code] = self.location_total.get(code, 0) + 1
+        if self.status[row] == DRIVER_STATUS_TO_CODE[DriverStatus.BUSY]:
+            self.location_busy[previous] -= 1
+            self.location_busy[code] = self.location_busy.get(code, 0) + 1
+        self.location[row] = code
+        self.invalidate(row)
+
+    def update_position(self, row: int, timestamp: float, latitude: float, longitude: float):
+        self.latitude[row] = latitude
+        self.longitude[row] = longitude
+        self.last_ping[row] = timestamp
+        self.invalidate(row)
+
+    def position(self, row: int) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+        """(latitude, longitude, last_ping_at) with None for drivers that never pinged (or unset coordinates)"""
+        last_ping = self.last_ping[row]
+        if math.isnan(last_ping):
+            return None, None, None
+        latitude, longitude = self.latitude[row], self.longitude[row]
+        return (
+            None if math.isnan(latitude) else latitude,
+            None if math.isnan(longitude) else longitude,
+            epoch_to_iso(last_ping)
+        )
+
+    def first_available(self, exclude_row: int = NO_DRIVER) -> Optional[int]:
+        """Lowest AVAILABLE row other than exclude_row (C-level array scan)"""
+        code = DRIVER_STATUS_TO_CODE[DriverStatus.AVAILABLE]
+        try:
+            row = self.status.index(code)
+            if row == exclude_row:
+                row = self.status.index(code, row + 1)
+        except ValueError:
+            return None
+        return row
+
+    def utilization_by_location(self) -> Dict[str, Dict]:
+        """BUSY / total drivers per location, read from the maintained counters"""
+        result = {}
+        for location_code, total in self.location_total.items():
+            if not total:
+                continue
+            busy = self.location_busy.get(location_code, 0)
+            result[self.locations.values[location_code]] = {
+                "busy": busy,
+                "total": total,
+                "utilization": busy / total
+            }
+        return result
+
+    def materialize(self, row: int) -> Driver:
+        """Build the API-facing Driver model for a row"""
+        latitude, longitude, last_ping_at = self.position(row)
+        return Driver.model_construct(
+            id=self.ids[row],
+            name=self.names[row],
+            status=DRIVER_STATUS_CODES[self.status[row]],
+            current_location=self.locations.values[self.location[row]],
+            latitude=latitude,
+            longitude=longitude,
+            last_ping_at=last_ping_at
+        )
+
+    def materialize_all(self) -> Dict[str, Driver]:
+        return {self.ids[row]: self.materialize(row) for row in range(len(self.ids))}
+
+    def gather_columns(self, rows: Sequence[int], fields: Tuple[str, ...]) -> Dict[str, Sequence]:
+        """Raw column values of rows for fields (C-level copies only)"""
+        raw = {"id": gather(self.ids, rows)}
+        if "name" in fields:
+            raw["name"] = gather(self.names, rows)
+        if "status" in fields:
+            raw["status"] = gather(self.status, rows)
+        if "current_location" in fields:
+            raw["current_location"] = gather(self.location, rows)
+            raw["locations"] = self.locations.values[:]
+        if "latitude" in fields or "longitude" in fields or "last_ping_at" in fields:
+            raw["last_ping_at"] = gather(self.last_ping, rows)
+            raw["latitude"] = gather(self.latitude, rows)
+            raw["longitude"] = gather(self.longitude, rows)
+        return raw
+
+    def render_columns(self, raw: Dict[str, Sequence], fields: Tuple[str, ...]) -> List[Sequence]:
+        """JSON-ready value columns for fields, in order (same values as materialize)"""
+        columns = []
+        for field in fields:
+            values = raw[field]
+            if field == "status":
+                values = list(map(DRIVER_STATUS_VALUES.__getitem__, values))
+            elif field == "current_location":
+                values = list(map(raw["locations"].__getitem__, values))
+            elif field == "last_ping_at":
+                values = epoch_column_to_datetimes(values)
+            elif field in ("latitude", "longitude"):
+                # Drivers that never pinged report no position at all
+                values = [None if p != p else v for v, p in zip(values, raw["last_ping_at"])]
+            columns.append(values)
+        return columns
+
+
+class SortedRowIndex:
+    """
+    Rows ordered by (created_at, row), kept in two parallel typed arrays.
+    Range and cursor lookups bisect instead of scanning.
+    """
+    __slots__ = ("created", "rows")
+
+    def __init__(self):
+        self.created = array("d")
+        self.rows = array("i")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self):
+        del self.created[:]
+        del self.rows[:]
+
+    def position(self, key: Tuple[float, int]) -> int:
+        """Index of the first entry whose (created_at, row) >= key"""
+        created, row = key
+        start = bisect_left(self.created, created)
+        end = start
+        size = len(self.created)
+        # Within a run of equal timestamps rows are ascending, so bisect on rows
+        if start < size and self.created[start] == created:
+            end = bisect_left(self.created, math.nextafter(created, math.inf), start)
+            return bisect_left(self.rows, row, start, end)
+        return start
+
+    def insert(self, created: float, row: int):
+        position = self.position((created, row))
+        if position == len(self.rows):
+            self.created.append(created)
+            self.rows.append(row)
+        else:
+            self.created.insert(position, created)
+            self.rows.insert(position, row)
+
+    def remove(self, created: float, row: int):
+        position = self.position((created, row))
+        del self.created[position]
+        del self.rows[position]
+
+
+class OrderTable(EncodedRowCache):
+    """
+    Column store for orders. The driver column holds DriverTable rows
+    (NO_DRIVER when unassigned) and created_at holds epoch seconds.
+    All mutations go through methods so derived state stays consistent.
+
+    Secondary indexes (kept in sync by the mutation methods):
+        by_created: every row
+        by_status:  status code -> rows in that status
+        by_driver:  driver row -> rows assigned to that driver
+    Each is a SortedRowIndex ordered by (created_at, row).
+    """
+    __slots__ = ("drivers", "ids", "index", "status", "driver", "reassign_count", "created_at",
+                 "by_created", "by_status", "by_driver")
+
+    FIELDS = ("id", "status", "assigned_driver_id", "reassign_count", "created_at")
+
+    def __init__(self, drivers: DriverTable, cache_limit: int = ENCODE_CACHE_ROWS):
+        super().__init__(cache_limit)
+        self.drivers = drivers
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.status = array("b")
+        self.driver = array("i")
+        self.reassign_count = array("I")
+        self.created_at = array("d")
+        self.by_created = SortedRowIndex()
+        self.by_status: List[SortedRowIndex] = [SortedRowIndex() for _ in ORDER_STATUS_CODES]
+        self.by_driver: Dict[int, SortedRowIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.index
+
+    def clear(self):
+        self.ids.clear()
+        self.index.clear()
+        del self.status[:]
+        del self.driver[:]
+        del self.reassign_count[:]
+        del self.created_at[:]
+        self.clear_cache()
+        self.by_created.clear()
+        for rows in self.by_status:
+            rows.clear()
+        self.by_driver.clear()
+
+    def add(self, order: Order) -> int:
+        """Append a validated Order model and return its row"""
+        # Compute and check every column value before the first append,
+        # so a bad order can never leave the columns misaligned
+        row = len(self.ids)
+        order_id = sys.intern(order.id)
+        status_code = ORDER_STATUS_TO_CODE[order.status]
+        driver_row = self.drivers.row(order.assigned_driver_id) if order.assigned_driver_id else NO_DRIVER
+        created = iso_to_epoch(order.created_at)
+        if not 0 <= order.reassign_count <= MAX_REASSIGN_COUNT:
+            raise ValueError(f"reassign_count {order.reassign_count} out of range")
+        epoch_to_iso(created)
+
+        self.ids.append(order_id)
+        self.index[order_id] = row
+        self.status.append(status_code)
+        self.driver.append(driver_row)
+        self.reassign_count.append(order.reassign_count)
+        self.created_at.append(created)
+        self.encoded.append(None)
+
+        self.by_created.insert(created, row)
+        self.by_status[status_code].insert(created, row)
+        if driver_row != NO_DRIVER:
+            self.by_driver.setdefault(driver_row, SortedRowIndex()).insert(created, row)
+        return row
+
+    def row(self, order_id: str) -> int:
+        return self.index[order_id]
+
+    def get_status(self, row: int) -> OrderStatus:
+        return ORDER_STATUS_CODES[self.status[row]]
+
+    def set_status(self, row: int, status: OrderStatus):
+        code = ORDER_STATUS_TO_CODE[status]
+        previous = self.status[row]
+        if previous == code:
+            return
+        created = self.created_at[row]
+        self.by_status[previous].remove(created, row)
+        self.by_status[code].insert(created, row)
+        self.status[row] = code
+        self.invalidate(row)
+
+    def driver_id(self, row: int) -> Optional[str]:
+        driver_row = self.driver[row]
+        return None if driver_row == NO_DRIVER else self.drivers.ids[driver_row]
+
+    def reassign(self, row: int, driver_row: int) -> int:
+        """Point the order at a new driver and bump its reassign counter"""
+        previous = self.driver[row]
+        created = self.created_at[row]
+        if previous != driver_row:
+            if previous != NO_DRIVER:
+                self.by_driver[previous].remove(created, row)
+            self.by_driver.setdefault(driver_row, SortedRowIndex()).insert(created, row)
+        self.driver[row] = driver_row
+        self.reassign_count[row] += 1
+        self.invalidate(row)
+        return self.reassign_count[row]
+
+    def count_by_status(self) -> Dict[OrderStatus, int]:
+        """Bulk status histogram straight off the status column"""
+        return {s: self.status.count(code) for code, s in enumerate(ORDER_STATUS_CODES)}
+
+    def query(
+        self,
+        status: Optional[OrderStatus] = None,
+        driver_row: Optional[int] = None,
+        created_from: Optional[float] = None,
+        created_to: Optional[float] = None,
+        after: Optional[Tuple[float, int]] = None,
+        limit: Optional[int] = None
+    ) -> List[int]:
+        """
+        Find rows matching every given filter, ordered by (created_at, row).
+        Bounds and cursor are bisected on the status/driver/created index, so
+        a page costs O(log n + page size). With both status and driver given,
+        the smaller index is walked and the other filter checked per row.
+
+        Args:
+            status: Only orders in this status
+            driver_row: Only orders assigned to this driver row
+            created_from: Inclusive lower bound on created_at (epoch seconds)
+            created_to: Exclusive upper bound on created_at (epoch seconds)
+            after: Cursor key - only rows strictly after this (created_at, row)
+            limit: Maximum number of rows to return
+
+        Returns:
+            Matching rows
+        """
+        lower = (created_from, -1) if created_from is not None else None
+        if after is not None and (lower is None or (after[0], after[1] + 1) > lower):
+            lower = (after[0], after[1] + 1)
+        upper = (created_to, -1) if created_to is not None else None
+
+        # Walk the smallest applicable index; the other filter (if any) is checked per row
+        index = self.by_created
+        check = None
+        if status is not None:
+            index = self.by_status[ORDER_STATUS_TO_CODE[status]]
+        if driver_row is not None:
+            driver_index = self.by_driver.get(driver_row) or SortedRowIndex()
+            if status is None:
+                index = driver_index
+            elif len(driver_index) < len(index):
+                status_code = ORDER_STATUS_TO_CODE[status]
+                check = lambda row: self.status[row] == status_code
+                index = driver_index
+            else:
+                check = lambda row: self.driver[row] == driver_row
+
+        start = 0 if lower is None else index.position(lower)
+        end = len(index) if upper is None else index.position(upper)
+        if check is None:
+            if limit is not None:
+                end = min(end, start + limit)
+            return index.rows[start:end].tolist()
+
+        rows = []
+        for position in range(start, end):
+            row = index.rows[position]
+            if check(row):
+                rows.append(row)
+                if limit is not None and len(rows) == limit:
+                    break
+        return rows
+
+    def materialize(self, row: int) -> Order:
+        """Build the API-facing Order model for a row"""
+        return Order.model_construct(
+            id=self.ids[row],
+            status=ORDER_STATUS_CODES[self.status[row]],
+            assigned_driver_id=self.driver_id(row),
+            reassign_count=self.reassign_count[row],
+            created_at=epoch_to_iso(self.created_at[row])
+        )
+
+    def materialize_all(self) -> Dict[str, Order]:
+        return {self.ids[row]: self.materialize(row) for row in range(len(self.ids))}
+
+    def gather_columns(self, rows: Sequence[int], fields: Tuple[str, ...]) -> Dict[str, Sequence]:
+        """Raw column values of rows for fields (C-level copies only)"""
+        raw = {"id": gather(self.ids, rows)}
+        if "status" in fields:
+            raw["status"] = gather(self.status, rows)
+        if "assigned_driver_id" in fields:
+            raw["assigned_driver_id"] = gather(self.driver, rows)
+            raw["driver_ids"] = self.drivers.ids[:]
+        if "reassign_count" in fields:
+            raw["reassign_count"] = gather(self.reassign_count, rows)
+        if "created_at" in fields:
+            raw["created_at"] = gather(self.created_at, rows)
+        return raw
+
+    def render_columns(self, raw: Dict[str, Sequence], fields: Tuple[str, ...]) -> List[Sequence]:
+        """JSON-ready value columns for fields, in order (same values as materialize)"""
+        columns = []
+        for field in fields:
+            values = raw[field]
+            if field == "status":
+                values = list(map(ORDER_STATUS_VALUES.__getitem__, values))
+            elif field == "assigned_driver_id":
+                driver_ids = raw["driver_ids"]
+                values = [None if d == NO_DRIVER else driver_ids[d] for d in values]
+            elif field == "created_at":
+                values = epoch_column_to_datetimes(values)
+            columns.append(values)
+        return columns
+
+
+# ============================================================================
+# FAST JSON RESPONSES (Encode straight from the column store)
+# ============================================================================
+
+def parse_fields(fields: Optional[str], allowed: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a ?fields=id,status projection against a table's FIELDS.
+
+    Returns:
+        Tuple of field names, or None for the full entity
+    """
+    if not fields:
+        return None
+    requested = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s) {unknown}. Allowed: {list(allowed)}"
+        )
+    return requested
+
+
+def encode_cursor(created: float, row: int) -> str:
+    """Opaque paging cursor for the (created_at, row) order of GET /orders"""
+    return f"{created!r}:{row}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        created, row = cursor.rsplit(":", 1)
+        return float(created), int(row)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor '{cursor}'"
+        )
+
+
+def parse_timestamp_param(name: str, value: Optional[str]) -> Optional[float]:
+    """Parse an ISO 8601 query parameter into epoch seconds"""
+    if value is None:
+        return None
+    try:
+        return iso_to_epoch(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"'{name}' must be an ISO 8601 timestamp"
+        )
+
+
+class RowSnapshot:
+    """
+    Rows of one table copied under state_store.lock, so they can be encoded
+    after the lock is released (see EncodedRowCache.snapshot).
+
+    cached: per requested row, its cached entry or None (full entities only)
+    rows:   rows whose columns were copied (uncached rows, or all for a projection)
+    """
+    __slots__ = ("table", "version", "cached", "rows", "fields", "raw")
+
+    def __init__(self, table: EncodedRowCache, cached, rows, fields, raw):
+        self.table = table
+        self.version = table.version
+        self.cached = cached
+        self.rows = rows
+        self.fields = fields
+        self.raw = raw
+
+
+def project_rows(fields: Tuple[str, ...], columns: List[Sequence]) -> List[Dict]:
+    """
+    Zip value columns into one dict per row. Dict displays are about twice
+    as fast as dict(zip(...)), so the common small projections use them.
+    """
+    if len(fields) == 1:
+        (f1,), (c1,) = fields, columns
+        return [{f1: a} for a in c1]
+    if len(fields) == 2:
+        f1, f2 = fields
+        return [{f1: a, f2: b} for a, b in zip(*columns)]
+    if len(fields) == 3:
+        f1, f2, f3 = fields
+        return [{f1: a, f2: b, f3: c} for a, b, c in zip(*columns)]
+    return list(map(dict, map(zip, repeat(fields), zip(*columns))))
+
+
+def encode_entity_map(snapshot: RowSnapshot, lock: threading.Lock) -> bytes:
+    """
+    Encode a snapshot as the inside of a JSON object keyed by entity id.
+    Call without holding lock: columns are rendered column-at-a-time, and
+    newly encoded full entities are stored back in the row cache under lock.
+    """
+    table = snapshot.table
+    ids = snapshot.raw["id"]
+    if snapshot.fields is not None:
+        columns = table.render_columns(snapshot.raw, snapshot.fields)
+        return json_dumps(dict(zip(ids, project_rows(snapshot.fields, columns))))[1:-1]
+
+    fresh = []
+    if snapshot.rows:
+        rows = project_rows(table.FIELDS, table.render_columns(snapshot.raw, table.FIELDS))
+        fresh = [json_dumps({entity_id: row})[1:-1] for entity_id, row in zip(ids, rows)]
+        with lock:
+            table.store_encoded(snapshot, fresh)
+    if not fresh:
+        return b",".join(snapshot.cached)
+    fresh_entries = iter(fresh)
+    return b",".join([entry if entry is not None else next(fresh_entries) for entry in snapshot.cached])
+
+
+def encode_list_response(meta: Dict, key: str, entity_map: bytes) -> Response:
+    """Splice a pre-encoded entity map into {...meta, key: {...}}"""
+    body = json_dumps(meta)[:-1] + b',"' + key.encode() + b'":{' + entity_map + b"}}"
+    return Response(content=body, media_type="application/json")
+
+
+# ============================================================================
+# AGGREGATE STATS (Incrementally Maintained)
+# ============================================================================
+
+# Per-event metrics tracked as lifetime totals and over rolling windows
+STAT_METRICS = (
+    "events",
+    "reassigned",
+    "reassign_failed",
+    "maintained",
+    "cancelled",
+    "risk_sum",
+    "orders_created"
+)
+ACTION_METRIC = {
+    "REASSIGNMENT_INITIATED": "reassigned",
+    "REASSIGNMENT_FAILED": "reassign_failed",
+    "MAINTAIN_ASSIGNMENT": "maintained"
+}
+
+
+class RollingWindow:
+    """
+    Fixed-size ring of one-second buckets with running totals per metric,
+    so reads are O(1) and expiry costs at most one pass over the ring.
+    """
+    __slots__ = ("seconds", "buckets", "totals", "head")
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.buckets = [array("d", [0.0]) * seconds for _ in STAT_METRICS]
+        self.totals = [0.0] * len(STAT_METRICS)
+        self.head: Optional[int] = None  # Epoch second of the newest bucket
+
+    def clear(self):
+        for bucket in self.buckets:
+            for slot in range(self.seconds):
+                bucket[slot] = 0.0
+        self.totals = [0.0] * len(STAT_METRICS)
+        self.head = None
+
+    def advance(self, second: int):
+        """Expire buckets that fell out of the window up to `second`"""
+        if self.head is None:
+            self.head = second
+            return
+        gap = second - self.head
+        if gap <= 0:
+            return
+        if gap >= self.seconds:
+            self.clear()
+        else:
+            for expired in range(self.head + 1, second + 1):
+                slot = expired % self.seconds
+                for i, bucket in enumerate(self.buckets):
+                    self.totals[i] -= bucket[slot]
+                    bucket[slot] = 0.0
+        self.head = second
+
+    def add(self, second: int, metric: int, value: float):
+        self.advance(second)
+        # Late (out-of-order) samples land in the newest bucket
+        slot = max(second, self.head) % self.seconds
+        self.buckets[metric][slot] += value
+        self.totals[metric] += value
+
+
+class StatsTracker:
+    """
+    Counters behind GET /stats. Updated as events are processed and orders
+    are created; entity counts come from the column store's own counters.
+    """
+
+    WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+
+    def __init__(self):
+        self.totals = [0.0] * len(STAT_METRICS)
+        self.windows = {name: RollingWindow(seconds) for name, seconds in self.WINDOWS.items()}
+
+    def clear(self):
+        self.totals = [0.0] * len(STAT_METRICS)
+        for window in self.windows.values():
+            window.clear()
+
+    def record(self, metric: str, value: float = 1.0, now: Optional[float] = None):
+        index = STAT_METRICS.index(metric)
+        second = int(time.time() if now is None else now)
+        self.totals[index] += value
+        for window in self.windows.values():
+            window.add(second, index, value)
+
+    def record_decision(self, action_taken: str, risk_score: float, cancelled: bool, now: Optional[float] = None):
+        """Record the outcome of one processed delay event"""
+        self.record("events", now=now)
+        self.record("risk_sum", risk_score, now=now)
+        self.record(ACTION_METRIC[action_taken], now=now)
+        if cancelled:
+            self.record("cancelled", now=now)
+
+    @staticmethod
+    def summarize(values: List[float]) -> Dict:
+        summary = {name: int(values[i]) for i, name in enumerate(STAT_METRICS) if name != "risk_sum"}
+        events = summary["events"]
+        summary["reassignment_rate"] = summary["reassigned"] / events if events else 0.0
+        summary["avg_risk"] = values[STAT_METRICS.index("risk_sum")] / events if events else 0.0
+        return summary
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        second = int(time.time() if now is None else now)
+        windows = {}
+        for name, window in self.windows.items():
+            window.advance(second)
+            windows[name] = self.summarize(window.totals)
+        return {"totals": self.summarize(self.totals), "windows": windows}
+
+
 # ============================================================================
 # IN-MEMORY STATE STORE (The Truth)
 # ============================================================================
@@ -108,10 +1034,12 @@ class StateStore:
     """
 
     def __init__(self):
-        self.drivers: Dict[str, Driver] = {}
-        self.orders: Dict[str, Order] = {}
+        self.drivers = DriverTable()
+        self.orders = OrderTable(self.drivers)
         self.processed_events: set = set()  # Track event IDs for idempotency
         self.event_history: List[Dict] = []
+        self.encoded_history: List[bytes] = []  # Encoded event_history entries (append-only)
+        self.stats = StatsTracker()
         self.lock = threading.Lock()  # Prevent concurrent modification issues
 
     def reset(self):
@@ -120,21 +1048,238 @@ class StateStore:
         self.orders.clear()
         self.processed_events.clear()
         self.event_history.clear()
+        self.encoded_history.clear()
+        self.stats.clear()
         print("[SYSTEM] - State reset triggered. Fresh slate ready.")
 
     def get_snapshot(self) -> SystemState:
         """Return current state for external consumption"""
         return SystemState(
-            drivers=self.drivers,
-            orders=self.orders,
+            drivers=self.drivers.materialize_all(),
+            orders=self.orders.materialize_all(),
             event_history=self.event_history,
             timestamp=datetime.now(timezone.utc).isoformat()
         )
 
+    def get_stats(self) -> Dict:
+        """Aggregate stats from maintained counters - never scans the dataset"""
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "orders": {
+                "total": len(self.orders),
+                "by_status": {s.value: len(rows) for s, rows in zip(ORDER_STATUS_CODES, self.orders.by_status)}
+            },
+            "drivers": {
+                "total": len(self.drivers),
+                "by_status": {s.value: n for s, n in zip(DRIVER_STATUS_CODES, self.drivers.status_counts)},
+                "utilization_by_location": self.drivers.utilization_by_location()
+            },
+            "events": self.stats.snapshot()
+        }
+
+    def encode_snapshot(self) -> bytes:
+        """
+        Encode the same document as get_snapshot() directly to JSON bytes,
+        reusing cached per-entity and per-event encodings. Takes self.lock
+        only to copy the rows; encoding happens after it is released.
+        """
+        with self.lock:
+            for entry in self.event_history[len(self.encoded_history):]:
+                self.encoded_history.append(json_dumps(entry))
+            history = self.encoded_history[:]
+            drivers = self.drivers.snapshot(range(len(self.drivers)))
+            orders = self.orders.snapshot(range(len(self.orders)))
+        return (
+            b'{"drivers":{' + encode_entity_map(drivers, self.lock)
+            + b'},"orders":{' + encode_entity_map(orders, self.lock)
+            + b'},"event_history":[' + b",".join(history)
+            + b'],"timestamp":' + json_dumps(datetime.now(timezone.utc).isoformat()) + b"}"
+        )
+
 
 # Global state store (persistent across requests)
 state_store = StateStore()
 
+# ============================================================================
+# TELEMETRY INGESTION (Coalesced, Batched Writes)
+# ============================================================================
+
+class PositionRing:
+    """Fixed-size ring of a driver's last N (timestamp, latitude, longitude) samples"""
+    __slots__ = ("size", "samples", "next", "count")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.samples = array("d", [0.0]) * (size * 3)
+        self.next = 0
+        self.count = 0
+
+    def append(self, timestamp: float, latitude: float, longitude: float):
+        """
+        Insert a sample in timestamp order. Late pings shift newer samples
+        up one slot; when the ring is full the oldest sample is dropped
+        (or the late ping itself, if it is older than everything kept).
+        """
+        size, samples = self.size, self.samples
+        if self.count == size and timestamp < samples[self.next * 3]:
+            return
+        pos = self.next
+        for _ in range(min(self.count, size - 1)):
+            prev = (pos - 1) % size
+            if samples[prev * 3] <= timestamp:
+                break
+            samples[pos * 3:pos * 3 + 3] = samples[prev * 3:prev * 3 + 3]
+            pos = prev
+        i = pos * 3
+        samples[i] = timestamp
+        samples[i + 1] = latitude
+        samples[i + 2] = longitude
+        self.next = (self.next + 1) % size
+        if self.count < size:
+            self.count += 1
+
+    def to_list(self) -> List[Dict]:
+        """Samples oldest first (by device timestamp)"""
+        start = (self.next - self.count) % self.size
+        positions = []
+        for k in range(self.count):
+            i = ((start + k) % self.size) * 3
+            positions.append({
+                "timestamp": epoch_to_iso(self.samples[i]),
+                "latitude": self.samples[i + 1],
+                "longitude": self.samples[i + 2]
+            })
+        return positions
+
+
+class TelemetryBuffer:
+    """
+    Absorbs high-frequency GPS pings without touching state_store.lock.
+    Pings are coalesced to the newest one per driver and applied to the
+    store in a single locked batch per flush; a ping older than the stored
+    position (a late arrival) is counted as stale and not applied. Every
+    accepted ping is also kept in the driver's PositionRing.
+    """
+
+    def __init__(self, history_size: int = TELEMETRY_HISTORY_SIZE):
+        self.history_size = history_size
+        self.pending: Dict[str, Tuple[float, float, float, Optional[str]]] = {}
+        self.tracks: Dict[str, PositionRing] = {}
+        self.lock = threading.Lock()
+        self.received = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.applied = 0
+        self.stale = 0
+        self.flushes = 0
+
+    def clear(self):
+        with self.lock:
+            self.pending.clear()
+            self.tracks.clear()
+            self.received = 0
+            self.coalesced = 0
+            self.rejected = 0
+            self.applied = 0
+            self.stale = 0
+            self.flushes = 0
+
+    def ingest(self, pings: List[TelemetryPing], known_drivers) -> int:
+        """
+        Buffer a batch of pings. Pings for unknown drivers are rejected.
+
+        Args:
+            pings: Validated pings
+            known_drivers: Container of valid driver ids (read without the store lock)
+
+        Returns:
+            Number of accepted pings
+        """
+        now = time.time()
+        accepted = 0
+        with self.lock:
+            for ping in pings:
+                driver_id = ping.driver_id
+                if driver_id not in known_drivers:
+                    self.rejected += 1
+                    continue
+                timestamp = now if ping.timestamp is None else ping.timestamp
+
+                track = self.tracks.get(driver_id)
+                if track is None:
+                    track = self.tracks[driver_id] = PositionRing(self.history_size)
+                track.append(timestamp, ping.latitude, ping.longitude)
+
+                current = self.pending.get(driver_id)
+                if current is None:
+                    self.pending[driver_id] = (timestamp, ping.latitude, ping.longitude, ping.location)
+                else:
+                    self.coalesced += 1
+                    if timestamp >= current[0]:
+                        self.pending[driver_id] = (
+                            timestamp, ping.latitude, ping.longitude, ping.location or current[3]
+                        )
+                accepted += 1
+            self.received += accepted
+        return accepted
+
+    def flush(self, store: StateStore) -> int:
+        """Apply coalesced positions to the store under one lock acquisition"""
+        with self.lock:
+            if not self.pending:
+                return 0
+            pending, self.pending = self.pending, {}
+
+        applied = stale = 0
+        with store.lock:
+            drivers = store.drivers
+            for driver_id, (timestamp, latitude, longitude, location) in pending.items():
+                row = drivers.index.get(driver_id)
+                if row is None:
+                    continue  # Driver vanished (reset) after the ping was buffered
+                if timestamp < drivers.last_ping[row]:  # False while last_ping is NaN
+                    stale += 1
+                    continue
+                drivers.update_position(row, timestamp, latitude, longitude)
+                if location is not None:
+                    drivers.set_location(row, location)
+                applied += 1
+
+        self.applied += applied
+        self.stale += stale
+        self.flushes += 1
+        return applied
+
+    def track(self, driver_id: str) -> List[Dict]:
+        with self.lock:
+            ring = self.tracks.get(driver_id)
+            return ring.to_list() if ring else []
+
+    def stats(self) -> Dict:
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "applied": self.applied,
+            "stale": self.stale,
+            "flushes": self.flushes,
+            "pending": len(self.pending)
+        }
+
+
+telemetry_buffer = TelemetryBuffer()
+
+
+async def telemetry_flush_loop():
+    """Periodically flush buffered telemetry off the event loop"""
+    while True:
+        await asyncio.sleep(TELEMETRY_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(telemetry_buffer.flush, state_store)
+        except Exception as e:
+            print(f"[TELEMETRY_ERROR] - Flush failed: {e}")
+
+
 # HTTP session for calling ML microservice with retries
 ml_session = requests.Session()
 retry_strategy = Retry(
@@ -226,7 +1371,7 @@ async def lifespan(app: FastAPI):
     ]
 
     for driver in drivers_data:
-        state_store.drivers[driver.id] = driver
+        state_store.drivers.add(driver)
         print(f"[INIT] - Seeded Driver: {driver.id} | {driver.name}")
 
     # Create 2 active orders
@@ -236,15 +1381,20 @@ async def lifespan(app: FastAPI):
     ]
 
     for order in orders_data:
-        state_store.orders[order.id] = order
+        state_store.orders.add(order)
         print(f"[INIT] - Seeded Order: {order.id} | Status: {order.status} | Assigned: {order.assigned_driver_id}")
 
+    flush_task = asyncio.create_task(telemetry_flush_loop())
+    print(f"[INIT] - ML risk scorer mode: {risk_scorer.name}")
+
     print("[STARTUP] - System ready. Awaiting delay events.")
     print("="*70 + "\n")
     
     yield  # Server runs here
     
     # Shutdown (cleanup if needed)
+    flush_task.cancel()
+    risk_scorer.close()
     print("[SHUTDOWN] - Server stopped.")
 
 # Initialize FastAPI app with lifespan
@@ -266,65 +1416,237 @@ app.add_middleware(
 
 
 # ============================================================================
-# ML PREDICTION ENGINE (Simulated)
+# ML PREDICTION ENGINE (Pluggable Scorers)
 # ============================================================================
 
-def predict_delay_risk(order_id: str, driver_id: str, reason: str) -> float:
+class RiskScorer(ABC):
+    """
+    Common scorer interface. Variants are swapped via ML_SCORER_MODE:
+        http       - call the ML microservice (scale ML separately)
+        inprocess  - import ml_service's scoring function and call it directly
+        pool       - in-process scoring inside a process pool (CPU-heavy models)
+    fallbacks counts scores that came from the local heuristic instead.
+    """
+    name = "base"
+    fallbacks = 0
+
+    @abstractmethod
+    def score(self, order_id: str, driver_id: str, reason: str) -> float:
+        """Risk in [0, 1] for one delay event"""
+
+    def score_batch(self, items: List[Tuple[str, str, str]]) -> List[float]:
+        """Score (order_id, driver_id, reason) tuples, in order"""
+        return [self.score(*item) for item in items]
+
+    def __call__(self, order_id: str, driver_id: str, reason: str) -> float:
+        return self.score(order_id, driver_id, reason)
+
+    def close(self):
+        pass
+
+
+class HttpRiskScorer(RiskScorer):
     """
-    Obtain a risk score from the ML microservice. If the ML service
+    Obtain risk scores from the ML microservice. If the ML service
     is unavailable, fall back to the local heuristic.
     """
-    ml_base = os.getenv("ML_SERVICE_URL", "http://127.0.0.1:8001")
-    ml_url = f"{ml_base}/predict-risk"
-    payload = {
-        "order_id": order_id,
-        "driver_id": driver_id,
-        "reason": reason
-    }
+    name = "http"
 
+    def __init__(self, base_url: Optional[str] = None, session: Optional[requests.Session] = None):
+        self.base_url = base_url or os.getenv("ML_SERVICE_URL", "http://127.0.0.1:8001")
+        self.session = session or ml_session
+
+    def score(self, order_id: str, driver_id: str, reason: str) -> float:
+        payload = {
+            "order_id": order_id,
+            "driver_id": driver_id,
+            "reason": reason
+        }
+
+        try:
+            resp = self.session.post(f"{self.base_url}/predict-risk", json=payload, timeout=2.0)
+            if resp.ok:
+                risk = float(resp.json()["risk_score"])
+                print(f"[ML_SERVICE] - Received risk_score={risk:.2f} from ML service")
+                return risk
+            else:
+                print(f"[ML_SERVICE] - Non-OK response from ML service: {resp.status_code}")
+        except requests.RequestException as e:
+            print(f"[ML_CALL_ERROR] - Could not reach ML service after retries: {e}")
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[ML_SERVICE] - Malformed response from ML service: {e!r}")
+
+        # Fallback heuristic if ML service is unreachable
+        self.fallbacks += 1
+        risk_score = heuristic_risk(reason)
+        print(f"[ML_PREDICTION_FALLBACK] - Risk Score: {risk_score:.2f} (Reason: '{reason}')")
+        return risk_score
+
+    def score_batch(self, items: List[Tuple[str, str, str]]) -> List[float]:
+        """One round trip to /predict-risk/batch; per-item fallback on failure"""
+        payload = {
+            "requests": [
+                {"order_id": order_id, "driver_id": driver_id, "reason": reason}
+                for order_id, driver_id, reason in items
+            ]
+        }
+        try:
+            resp = self.session.post(f"{self.base_url}/predict-risk/batch", json=payload, timeout=5.0)
+            if resp.ok:
+                risks = [float(risk) for risk in resp.json()["risk_scores"]]
+                if len(risks) == len(items):
+                    return risks
+                print(f"[ML_SERVICE] - ML batch endpoint returned {len(risks)} scores for {len(items)} requests")
+            else:
+                print(f"[ML_SERVICE] - Non-OK response from ML batch endpoint: {resp.status_code}")
+        except requests.RequestException as e:
+            print(f"[ML_CALL_ERROR] - Could not reach ML batch endpoint after retries: {e}")
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[ML_SERVICE] - Malformed response from ML batch endpoint: {e!r}")
+        self.fallbacks += len(items)
+        return [heuristic_risk(reason) for _, _, reason in items]
+
+
+def load_ml_scoring():
+    """
+    Import ml_service's scoring function for in-process mode.
+    The repository root is added to sys.path when the backend is started
+    from inside backend/ (python logistics_backend.py).
+    """
     try:
-        resp = ml_session.post(ml_url, json=payload, timeout=2.0)
-        if resp.ok:
-            data = resp.json()
-            risk = float(data.get("risk_score", 0.0))
-            print(f"[ML_SERVICE] - Received risk_score={risk:.2f} from ML service")
+        from ml_service.main import score_risk
+    except ImportError:
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from ml_service.main import score_risk
+    return score_risk
+
+
+class InProcessRiskScorer(RiskScorer):
+    """Call ml_service's scoring function directly - no network or JSON hop"""
+    name = "inprocess"
+
+    def __init__(self):
+        self.score_fn = load_ml_scoring()
+
+    def score(self, order_id: str, driver_id: str, reason: str) -> float:
+        risk = float(self.score_fn(order_id, driver_id, reason))
+        print(f"[ML_INPROCESS] - risk_score={risk:.2f}")
+        return risk
+
+
+def _score_in_worker(order_id: str, driver_id: str, reason: str) -> float:
+    """Process pool entry point (module-level so it can be pickled)"""
+    global _worker_score_fn
+    if _worker_score_fn is None:
+        _worker_score_fn = load_ml_scoring()
+    return float(_worker_score_fn(order_id, driver_id, reason))
+
+
+_worker_score_fn = None
+
+
+class PooledRiskScorer(RiskScorer):
+    """
+    In-process scoring inside a process pool so CPU-heavy inference runs
+    off the GIL. Batches are spread across workers with executor.map.
+    """
+    name = "pool"
+
+    def __init__(self, workers: int = 2, timeout: float = 2.0):
+        from concurrent.futures import ProcessPoolExecutor
+        load_ml_scoring()  # Fail fast in the parent if ml_service is missing
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.workers = workers
+        self.timeout = timeout
+
+    def score(self, order_id: str, driver_id: str, reason: str) -> float:
+        try:
+            risk = self.pool.submit(_score_in_worker, order_id, driver_id, reason).result(timeout=self.timeout)
+            print(f"[ML_POOL] - risk_score={risk:.2f}")
             return risk
-        else:
-            print(f"[ML_SERVICE] - Non-OK response from ML service: {resp.status_code}")
-    except requests.RequestException as e:
-        print(f"[ML_CALL_ERROR] - Could not reach ML service after retries: {e}")
+        except Exception as e:
+            self.fallbacks += 1
+            risk_score = heuristic_risk(reason)
+            print(f"[ML_POOL_ERROR] - {e!r}. Fallback Risk Score: {risk_score:.2f}")
+            return risk_score
+
+    def score_batch(self, items: List[Tuple[str, str, str]]) -> List[float]:
+        if not items:
+            return []
+        order_ids, driver_ids, reasons = zip(*items)
+        chunksize = max(1, len(items) // (self.workers * 4))
+        try:
+            return list(self.pool.map(_score_in_worker, order_ids, driver_ids, reasons, chunksize=chunksize))
+        except Exception as e:
+            print(f"[ML_POOL_ERROR] - {e!r}. Using heuristic for {len(items)} batched scores")
+            self.fallbacks += len(items)
+            return [heuristic_risk(reason) for reason in reasons]
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_risk_scorer(mode: Optional[str] = None) -> RiskScorer:
+    """
+    Create the scorer selected by ML_SCORER_MODE (http | inprocess | pool).
+    Falls back to HTTP if ml_service cannot be imported or fails to initialize.
+    """
+    mode = (mode or os.getenv("ML_SCORER_MODE", "http")).lower()
+    try:
+        if mode == "inprocess":
+            return InProcessRiskScorer()
+        if mode == "pool":
+            return PooledRiskScorer(workers=int(os.getenv("ML_SCORER_WORKERS", "2")))
+    except Exception as e:
+        print(f"[ML_CONFIG_ERROR] - Cannot load ml_service for '{mode}' mode ({e}). Using HTTP scorer.")
+        return HttpRiskScorer()
+    if mode != "http":
+        print(f"[ML_CONFIG_ERROR] - Unknown ML_SCORER_MODE '{mode}'. Using HTTP scorer.")
+    return HttpRiskScorer()
+
+
+risk_scorer = build_risk_scorer()
+
+
+def predict_delay_risk(order_id: str, driver_id: str, reason: str) -> float:
+    """Risk score for a delay event from the configured scorer"""
+    return risk_scorer.score(order_id, driver_id, reason)
+
 
-    # Fallback heuristic if ML service is unreachable
+def heuristic_risk(reason: str, rng: random.Random = random) -> float:
+    """Local risk heuristic: longer reasons read as riskier, plus noise"""
     base_risk = len(reason) / 100.0
-    ml_noise = random.uniform(0.0, 0.3)
-    risk_score = min(1.0, base_risk + ml_noise)
-    print(f"[ML_PREDICTION_FALLBACK] - Risk Score: {risk_score:.2f} (Reason: '{reason}')")
-    return risk_score
+    ml_noise = rng.uniform(0.0, 0.3)
+    return min(1.0, base_risk + ml_noise)
 
 
 # ============================================================================
 # REASSIGNMENT LOGIC
 # ============================================================================
 
-def find_available_driver(exclude_driver_id: Optional[str] = None) -> Optional[str]:
+def find_available_driver(exclude_driver_id: Optional[str] = None, store: Optional[StateStore] = None) -> Optional[str]:
     """
     Find the first available driver for reassignment.
 
     Args:
         exclude_driver_id: Don't reassign to this driver
+        store: State store to search (defaults to the global state_store)
 
     Returns:
         Available driver ID or None
     """
-    for driver_id, driver in state_store.drivers.items():
-        if driver_id == exclude_driver_id:
-            continue
-        if driver.status == DriverStatus.AVAILABLE:
-            return driver_id
-    return None
-
-
-def reassign_order(order_id: str, current_driver_id: Optional[str]) -> bool:
+    drivers = (store or state_store).drivers
+    exclude_row = drivers.index.get(exclude_driver_id, NO_DRIVER) if exclude_driver_id else NO_DRIVER
+    row = drivers.first_available(exclude_row=exclude_row)
+    return None if row is None else drivers.ids[row]
+
+
+def reassign_order(
+    order_id: str,
+    current_driver_id: Optional[str],
+    store: Optional[StateStore] = None,
+    max_reassignments: Optional[int] = None
+) -> bool:
     """
     Attempt to reassign order to an available driver.
     Enforces MAX_REASSIGNMENTS constraint.
@@ -332,31 +1654,36 @@ def reassign_order(order_id: str, current_driver_id: Optional[str]) -> bool:
     Args:
         order_id: Order to reassign
         current_driver_id: Current assigned driver (to exclude)
+        store: State store to mutate (defaults to the global state_store)
+        max_reassignments: Override for MAX_REASSIGNMENTS
 
     Returns:
         True if reassignment successful, False otherwise
     """
-    order = state_store.orders[order_id]
+    store = store or state_store
+    max_reassignments = MAX_REASSIGNMENTS if max_reassignments is None else max_reassignments
+    orders = store.orders
+    row = orders.row(order_id)
 
     # Check reassignment limit
-    if order.reassign_count >= MAX_REASSIGNMENTS:
-        print(f"[DECISION] - Order {order_id} hit max reassignments ({MAX_REASSIGNMENTS}). CANCELLING.")
-        order.status = OrderStatus.CANCELLED
+    if orders.reassign_count[row] >= max_reassignments:
+        print(f"[DECISION] - Order {order_id} hit max reassignments ({max_reassignments}). CANCELLING.")
+        orders.set_status(row, OrderStatus.CANCELLED)
         return False
 
     # Find available driver
-    available_driver = find_available_driver(exclude_driver_id=current_driver_id)
+    available_driver = find_available_driver(exclude_driver_id=current_driver_id, store=store)
 
     if not available_driver:
         print(f"[ERROR] - No drivers available for reassignment. Order {order_id} remains DELAYED.")
         return False
 
     # Execute reassignment
-    order.assigned_driver_id = available_driver
-    order.reassign_count += 1
-    state_store.drivers[available_driver].status = DriverStatus.BUSY
+    driver_row = store.drivers.row(available_driver)
+    attempt = orders.reassign(row, driver_row)
+    store.drivers.set_status(driver_row, DriverStatus.BUSY)
 
-    print(f"[REASSIGNMENT_SUCCESS] - Order {order_id} reassigned to {available_driver} (Attempt #{order.reassign_count})")
+    print(f"[REASSIGNMENT_SUCCESS] - Order {order_id} reassigned to {available_driver} (Attempt #{attempt})")
     return True
 
 
@@ -364,6 +1691,116 @@ def reassign_order(order_id: str, current_driver_id: Optional[str]) -> bool:
 # CORE ENDPOINT: POST /event/delay
 # ============================================================================
 
+def process_delay_event(
+    event: DelayEvent,
+    store: Optional[StateStore] = None,
+    score_risk=None,
+    risk_threshold: Optional[float] = None,
+    max_reassignments: Optional[int] = None
+) -> Dict:
+    """
+    The delay decision pipeline, independent of HTTP and of the global store.
+    Used by POST /event/delay and by the headless simulation engine.
+    Caller must hold store.lock when the store is shared.
+
+    Args:
+        event: DelayEvent payload
+        store: State store to read and mutate (defaults to the global state_store)
+        score_risk: Callable (order_id, driver_id, reason) -> risk (defaults to predict_delay_risk)
+        risk_threshold: Override for ML_RISK_THRESHOLD
+        max_reassignments: Override for MAX_REASSIGNMENTS
+
+    Returns:
+        Decision summary with action taken
+
+    Raises:
+        HTTPException: 400 if the order or driver is unknown
+    """
+    store = store or state_store
+    score_risk = score_risk or predict_delay_risk
+    risk_threshold = ML_RISK_THRESHOLD if risk_threshold is None else risk_threshold
+
+    # ========== STEP 1: IDEMPOTENCY CHECK ==========
+    if event.event_id in store.processed_events:
+        print(f"[IDEMPOTENCY] - Event {event.event_id} already processed. Ignoring duplicate.")
+        return {
+            "status": "ignored",
+            "reason": "Duplicate event",
+            "event_id": event.event_id
+        }
+
+    # ========== STEP 2: VALIDATION ==========
+    # Check if order exists
+    if event.order_id not in store.orders:
+        print(f"[VALIDATION_ERROR] - Order {event.order_id} not found in system.")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Order '{event.order_id}' not found"
+        )
+
+    # Check if driver exists
+    if event.driver_id not in store.drivers:
+        print(f"[VALIDATION_ERROR] - Driver {event.driver_id} not found in system.")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Driver '{event.driver_id}' not found"
+        )
+
+    orders = store.orders
+    row = orders.row(event.order_id)
+
+    # ========== STEP 3: UPDATE STATE ==========
+    orders.set_status(row, OrderStatus.DELAYED)
+    print(f"[STATE_UPDATE] - Order {event.order_id} marked as DELAYED")
+
+    # ========== STEP 4: ML PREDICTION ==========
+    risk_score = score_risk(event.order_id, event.driver_id, event.reason)
+
+    # ========== STEP 5: DECISION GATE ==========
+    if risk_score > risk_threshold:
+        print(f"[DECISION] - Risk {risk_score:.2f} > Threshold {risk_threshold}. Initiating REASSIGNMENT.")
+        action_taken = "REASSIGNMENT_INITIATED"
+
+        success = reassign_order(event.order_id, event.driver_id, store=store, max_reassignments=max_reassignments)
+
+        if not success:
+            action_taken = "REASSIGNMENT_FAILED"
+
+    else:
+        print(f"[DECISION] - Risk {risk_score:.2f} <= Threshold {risk_threshold}. Maintaining assignment. UI notified.")
+        action_taken = "MAINTAIN_ASSIGNMENT"
+
+    # ========== STEP 6: RECORD EVENT ==========
+    store.processed_events.add(event.event_id)
+    store.stats.record_decision(
+        action_taken,
+        risk_score,
+        cancelled=orders.get_status(row) == OrderStatus.CANCELLED
+    )
+    store.event_history.append({
+        "event_id": event.event_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "order_id": event.order_id,
+        "driver_id": event.driver_id,
+        "reason": event.reason,
+        "risk_score": risk_score,
+        "action_taken": action_taken,
+        "order_status": orders.get_status(row)
+    })
+
+    print(f"[EVENT_COMPLETE] - Event {event.event_id} processed successfully.\n")
+
+    return {
+        "status": "success",
+        "event_id": event.event_id,
+        "order_id": event.order_id,
+        "risk_score": risk_score,
+        "action_taken": action_taken,
+        "order_status": orders.get_status(row),
+        "reassign_count": orders.reassign_count[row]
+    }
+
+
 @app.post("/event/delay", status_code=status.HTTP_202_ACCEPTED)
 def handle_delay_event(event: DelayEvent):
     """
@@ -386,121 +1823,49 @@ def handle_delay_event(event: DelayEvent):
 
     # Thread-safe execution with lock
     with state_store.lock:
-        # ========== STEP 1: IDEMPOTENCY CHECK ==========
-        if event.event_id in state_store.processed_events:
-            print(f"[IDEMPOTENCY] - Event {event.event_id} already processed. Ignoring duplicate.")
-            return {
-                "status": "ignored",
-                "reason": "Duplicate event",
-                "event_id": event.event_id
-            }
-
-        # ========== STEP 2: VALIDATION ==========
-        # Check if order exists
-        if event.order_id not in state_store.orders:
-            print(f"[VALIDATION_ERROR] - Order {event.order_id} not found in system.")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Order '{event.order_id}' not found"
-            )
-
-        # Check if driver exists
-        if event.driver_id not in state_store.drivers:
-            print(f"[VALIDATION_ERROR] - Driver {event.driver_id} not found in system.")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Driver '{event.driver_id}' not found"
-            )
-
-        order = state_store.orders[event.order_id]
-
-        # ========== STEP 3: UPDATE STATE ==========
-        order.status = OrderStatus.DELAYED
-        print(f"[STATE_UPDATE] - Order {event.order_id} marked as DELAYED")
-
-        # ========== STEP 4: ML PREDICTION ==========
-        risk_score = predict_delay_risk(event.order_id, event.driver_id, event.reason)
-
-        # ========== STEP 5: DECISION GATE ==========
-        decision_made = False
-        action_taken = None
+        response_data = process_delay_event(event)
+        if response_data["status"] != "success":
+            return response_data
+        new_driver_id = state_store.orders.driver_id(state_store.orders.row(event.order_id))
+
+    # ========== STEP 7: BROADCAST TO ALL CONNECTED CLIENTS ==========
+    # Notify all connected drivers about the event
+    action_taken = response_data["action_taken"]
+    broadcast_message = {
+        "type": "emergency_event",
+        "event_id": event.event_id,
+        "order_id": event.order_id,
+        "driver_id": event.driver_id,
+        "reason": event.reason,
+        "risk_score": response_data["risk_score"],
+        "action_taken": action_taken,
+        "new_driver_id": new_driver_id if action_taken == "REASSIGNMENT_INITIATED" else None,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
 
-        if risk_score > ML_RISK_THRESHOLD:
-            print(f"[DECISION] - Risk {risk_score:.2f} > Threshold {ML_RISK_THRESHOLD}. Initiating REASSIGNMENT.")
-            action_taken = "REASSIGNMENT_INITIATED"
+    # Sync endpoints run in a worker thread, so hop back onto the event loop to broadcast
+    from_thread.run(manager.broadcast, broadcast_message)
+    print(f"[BROADCAST] - Emergency event broadcasted to {manager.get_connection_count()} connected clients")
 
-            success = reassign_order(event.order_id, event.driver_id)
-            decision_made = True
-
-            if not success:
-                action_taken = "REASSIGNMENT_FAILED"
-
-        else:
-            print(f"[DECISION] - Risk {risk_score:.2f} <= Threshold {ML_RISK_THRESHOLD}. Maintaining assignment. UI notified.")
-            action_taken = "MAINTAIN_ASSIGNMENT"
-            decision_made = True
-
-        # ========== STEP 6: RECORD EVENT ==========
-        state_store.processed_events.add(event.event_id)
-        state_store.event_history.append({
-            "event_id": event.event_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "order_id": event.order_id,
-            "driver_id": event.driver_id,
-            "reason": event.reason,
-            "risk_score": risk_score,
-            "action_taken": action_taken,
-            "order_status": order.status
-        })
-
-        print(f"[EVENT_COMPLETE] - Event {event.event_id} processed successfully.\n")
-
-        response_data = {
-            "status": "success",
-            "event_id": event.event_id,
-            "order_id": event.order_id,
-            "risk_score": risk_score,
-            "action_taken": action_taken,
-            "order_status": order.status,
-            "reassign_count": order.reassign_count
-        }
-        
-        # ========== STEP 7: BROADCAST TO ALL CONNECTED CLIENTS ==========
-        # Notify all connected drivers about the event
-        import asyncio
-        broadcast_message = {
-            "type": "emergency_event",
-            "event_id": event.event_id,
-            "order_id": event.order_id,
-            "driver_id": event.driver_id,
-            "reason": event.reason,
-            "risk_score": risk_score,
-            "action_taken": action_taken,
-            "new_driver_id": order.assigned_driver_id if action_taken == "REASSIGNMENT_INITIATED" else None,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-        
-        asyncio.create_task(manager.broadcast(broadcast_message))
-        print(f"[BROADCAST] - Emergency event broadcasted to {manager.get_connection_count()} connected clients")
-
-        return response_data
+    return response_data
 
 
 # ============================================================================
 # OBSERVATION ENDPOINT: GET /state
 # ============================================================================
 
-@app.get("/state")
-def get_system_state() -> SystemState:
+@app.get("/state", response_model=SystemState)
+def get_system_state():
     """
     Expose complete system state for frontend visualization and debugging.
     This is the "God view" - you can see everything.
 
     Returns:
-        Complete system state snapshot
+        Complete system state snapshot (pre-encoded JSON)
     """
     print("[STATE_QUERY] - System state requested")
-    return state_store.get_snapshot()
+    body = state_store.encode_snapshot()
+    return Response(content=body, media_type="application/json")
 
 
 # ============================================================================
@@ -508,20 +1873,33 @@ def get_system_state() -> SystemState:
 # ============================================================================
 
 @app.get("/drivers")
-def list_drivers():
+def list_drivers(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated projection, e.g. id,status")
+):
     """
-    List all drivers and their current status.
+    List drivers and their current status.
     Useful for monitoring and debugging.
 
+    Args:
+        offset: Number of drivers to skip
+        limit: Maximum number of drivers to return (all when omitted)
+        fields: Optional field projection
+
     Returns:
-        Dictionary of all drivers
+        Dictionary of drivers (pre-encoded JSON)
     """
     print("[QUERY] - Listing all drivers")
+    projection = parse_fields(fields, DriverTable.FIELDS)
     with state_store.lock:
-        return {
-            "count": len(state_store.drivers),
-            "drivers": state_store.drivers
-        }
+        total = len(state_store.drivers)
+        end = total if limit is None else min(total, offset + limit)
+        snapshot = state_store.drivers.snapshot(range(offset, end), projection)
+    entity_map = encode_entity_map(snapshot, state_store.lock)
+    return encode_list_response(
+        {"count": total, "offset": offset, "limit": limit}, "drivers", entity_map
+    )
 
 
 @app.get("/drivers/{driver_id}")
@@ -541,7 +1919,7 @@ def get_driver(driver_id: str):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Driver '{driver_id}' not found"
             )
-        return state_store.drivers[driver_id]
+        return state_store.drivers.materialize(state_store.drivers.row(driver_id))
 
 
 @app.post("/drivers", status_code=status.HTTP_201_CREATED)
@@ -553,7 +1931,7 @@ def create_driver(driver: Driver):
         driver: Driver entity to create
 
     Returns:
-        Created driver
+        Created driver as stored (same as GET /drivers/{id}: last_ping_at in UTC)
     """
     with state_store.lock:
         if driver.id in state_store.drivers:
@@ -561,9 +1939,82 @@ def create_driver(driver: Driver):
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Driver '{driver.id}' already exists"
             )
-        state_store.drivers[driver.id] = driver
+        row = state_store.drivers.add(driver)
         print(f"[CREATE] - New driver added: {driver.id} | {driver.name}")
-        return driver
+        return state_store.drivers.materialize(row)
+
+
+# ============================================================================
+# TELEMETRY ENDPOINTS
+# ============================================================================
+
+def ingest_telemetry_json(body: bytes) -> Dict:
+    """Validate a raw TelemetryBatch body and buffer its pings (runs in a worker thread)"""
+    batch = TelemetryBatch.model_validate_json(body)
+    accepted = telemetry_buffer.ingest(batch.pings, state_store.drivers)
+    return {
+        "status": "accepted",
+        "accepted": accepted,
+        "rejected": len(batch.pings) - accepted
+    }
+
+
+def _telemetry_request_schema() -> Dict:
+    """Inline TelemetryBatch JSON schema for the docs (the body is parsed by hand)"""
+    schema = TelemetryBatch.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    schema["properties"]["pings"]["items"] = definitions["TelemetryPing"]
+    return schema
+
+
+@app.post(
+    "/telemetry",
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _telemetry_request_schema()}}
+        }
+    }
+)
+async def ingest_telemetry(request: Request):
+    """
+    Ingest a batch of driver GPS pings (TelemetryBatch body).
+    Validation and buffering run in a worker thread so large batches do not
+    block the event loop. Pings are coalesced per driver; the store is
+    updated by the periodic flush, so positions become visible within
+    TELEMETRY_FLUSH_INTERVAL seconds.
+
+    Returns:
+        Accepted / rejected ping counts
+    """
+    body = await request.body()
+    try:
+        return await asyncio.to_thread(ingest_telemetry_json, body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False, include_input=False))
+
+
+@app.get("/drivers/{driver_id}/track")
+def get_driver_track(driver_id: str):
+    """
+    Recent positions of a driver, oldest first (last TELEMETRY_HISTORY_SIZE pings).
+
+    Args:
+        driver_id: Driver identifier
+
+    Returns:
+        Driver id and position history
+    """
+    if driver_id not in state_store.drivers:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Driver '{driver_id}' not found"
+        )
+    return {
+        "driver_id": driver_id,
+        "positions": telemetry_buffer.track(driver_id)
+    }
 
 
 # ============================================================================
@@ -571,20 +2022,66 @@ def create_driver(driver: Driver):
 # ============================================================================
 
 @app.get("/orders")
-def list_orders():
+def list_orders(
+    status_filter: Optional[OrderStatus] = Query(None, alias="status"),
+    driver_id: Optional[str] = Query(None, description="Only orders assigned to this driver"),
+    created_from: Optional[str] = Query(None, description="Inclusive ISO 8601 lower bound on created_at"),
+    created_to: Optional[str] = Query(None, description="Exclusive ISO 8601 upper bound on created_at"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated projection, e.g. id,status")
+):
     """
-    List all orders and their current status.
-    Useful for monitoring and debugging.
+    List orders, optionally filtered via the StateStore secondary indexes.
+    Results are ordered by created_at; pass next_cursor back as ?cursor=
+    to fetch the following page.
+
+    Args:
+        status_filter: Only orders in this status (?status=DELAYED)
+        driver_id: Only orders assigned to this driver
+        created_from: Inclusive lower bound on created_at
+        created_to: Exclusive upper bound on created_at
+        cursor: Resume after the last order of a previous page
+        offset: Number of matching orders to skip
+        limit: Maximum number of orders to return (all when omitted)
+        fields: Optional field projection
 
     Returns:
-        Dictionary of all orders
+        Dictionary of orders (pre-encoded JSON) plus next_cursor
     """
-    print("[QUERY] - Listing all orders")
+    print("[QUERY] - Listing orders")
+    projection = parse_fields(fields, OrderTable.FIELDS)
+    after = decode_cursor(cursor) if cursor else None
+    since = parse_timestamp_param("created_from", created_from)
+    until = parse_timestamp_param("created_to", created_to)
+
     with state_store.lock:
-        return {
-            "count": len(state_store.orders),
-            "orders": state_store.orders
-        }
+        orders = state_store.orders
+        if driver_id is not None and driver_id not in state_store.drivers:
+            rows = []
+        else:
+            rows = orders.query(
+                status=status_filter,
+                driver_row=state_store.drivers.row(driver_id) if driver_id is not None else None,
+                created_from=since,
+                created_to=until,
+                after=after,
+                limit=None if limit is None else offset + limit + 1
+            )[offset:]
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(orders.created_at[rows[-1]], rows[-1])
+        snapshot = orders.snapshot(rows, projection)
+        total = len(orders)
+    entity_map = encode_entity_map(snapshot, state_store.lock)
+
+    return encode_list_response(
+        {"count": total, "returned": len(rows), "offset": offset, "limit": limit, "next_cursor": next_cursor},
+        "orders",
+        entity_map
+    )
 
 
 @app.get("/orders/{order_id}")
@@ -604,7 +2101,7 @@ def get_order(order_id: str):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Order '{order_id}' not found"
             )
-        return state_store.orders[order_id]
+        return state_store.orders.materialize(state_store.orders.row(order_id))
 
 
 @app.post("/orders", status_code=status.HTTP_201_CREATED)
@@ -616,7 +2113,7 @@ def create_order(order: Order):
         order: Order entity to create
 
     Returns:
-        Created order
+        Created order as stored (same as GET /orders/{id}: created_at in UTC)
     """
     with state_store.lock:
         if order.id in state_store.orders:
@@ -632,12 +2129,17 @@ def create_order(order: Order):
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Assigned driver '{order.assigned_driver_id}' not found"
                 )
-            # Mark driver as busy
-            state_store.drivers[order.assigned_driver_id].status = DriverStatus.BUSY
         
-        state_store.orders[order.id] = order
+        row = state_store.orders.add(order)
+
+        # Mark driver as busy only once the order is stored
+        if order.assigned_driver_id:
+            drivers = state_store.drivers
+            drivers.set_status(drivers.row(order.assigned_driver_id), DriverStatus.BUSY)
+
+        state_store.stats.record("orders_created")
         print(f"[CREATE] - New order added: {order.id} | Assigned to: {order.assigned_driver_id}")
-        return order
+        return state_store.orders.materialize(row)
 
 
 # ============================================================================
@@ -654,7 +2156,9 @@ def reset_system():
         Confirmation message
     """
     print("[RESET_INITIATED] - Wiping all state...")
-    state_store.reset()
+    with state_store.lock:
+        state_store.reset()
+    telemetry_buffer.clear()
     return {
         "status": "success",
         "message": "System reset complete. Ready for fresh demo."
@@ -682,6 +2186,26 @@ def health_check():
     }
 
 
+# ============================================================================
+# STATS ENDPOINT: GET /stats
+# ============================================================================
+
+@app.get("/stats")
+def get_stats():
+    """
+    Dashboard aggregates: counts per status, driver utilization per location,
+    reassignment rate and average risk, lifetime and over 1m/5m/1h windows.
+    Served from incrementally maintained counters (O(1) in dataset size).
+
+    Returns:
+        Aggregate statistics
+    """
+    with state_store.lock:
+        stats = state_store.get_stats()
+    stats["telemetry"] = telemetry_buffer.stats()
+    return stats
+
+
 # ============================================================================
 # ROOT ENDPOINT: GET /
 # ============================================================================
@@ -700,10 +2224,13 @@ def root():
         "endpoints": {
             "health": "GET /health",
             "state": "GET /state",
+            "stats": "GET /stats",
             "delay_event": "POST /event/delay",
             "drivers": "GET /drivers",
             "create_driver": "POST /drivers",
             "get_driver": "GET /drivers/{driver_id}",
+            "driver_track": "GET /drivers/{driver_id}/track",
+            "telemetry": "POST /telemetry",
             "orders": "GET /orders",
             "create_order": "POST /orders",
             "get_order": "GET /orders/{order_id}",
@@ -718,6 +2245,50 @@ def root():
 # WEBSOCKET ENDPOINT: /ws (Real-Time Event Broadcasting)
 # ============================================================================
 
+def ingest_telemetry_message(data: str) -> Optional[List[Dict]]:
+    """
+    Parse, validate and buffer an upstream /ws message (runs in a worker
+    thread). Accepts either a batch ({"type": "telemetry", "pings": [...]})
+    or a single ping with the ping fields inline.
+
+    Returns:
+        None if the message is not telemetry, else its validation errors
+        (empty when the pings were buffered)
+    """
+    try:
+        message = json_loads(data)
+    except ValueError:
+        return None
+    if not isinstance(message, dict) or message.get("type") != "telemetry":
+        return None
+
+    pings = message.get("pings")
+    if pings is None:
+        pings = [{k: v for k, v in message.items() if k != "type"}]
+    try:
+        batch = TelemetryBatch(pings=pings)
+    except ValidationError as e:
+        return e.errors(include_url=False, include_context=False, include_input=False)
+
+    telemetry_buffer.ingest(batch.pings, state_store.drivers)
+    return []
+
+
+async def handle_telemetry_message(websocket: WebSocket, data: str) -> bool:
+    """
+    Buffer an upstream telemetry message without blocking the event loop.
+
+    Returns:
+        True if the message was a telemetry message (handled silently)
+    """
+    errors = await asyncio.to_thread(ingest_telemetry_message, data)
+    if errors is None:
+        return False
+    if errors:
+        await websocket.send_json({"type": "telemetry_error", "detail": errors})
+    return True
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
@@ -727,6 +2298,9 @@ async def websocket_endpoint(websocket: WebSocket):
     - Emergency events reported
     - Driver reassignments
     - Order status changes
+
+    Clients can also stream GPS telemetry upstream on the same socket:
+        {"type": "telemetry", "pings": [{"driver_id": "DRV-001", "latitude": 12.97, "longitude": 77.59}]}
     
     Usage:
         const ws = new WebSocket('ws://localhost:8000/ws');
@@ -740,6 +2314,8 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             # Keep connection alive and listen for any messages from client
             data = await websocket.receive_text()
+            if await handle_telemetry_message(websocket, data):
+                continue
             print(f"[WEBSOCKET_MESSAGE] - Received from client: {data}")
     except WebSocketDisconnect:
         manager.disconnect(websocket)
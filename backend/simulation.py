@@ -0,0 +1,431 @@
+"""
+SIMULATION ENGINE - Headless Replay & What-If Tuning
+=====================================================
+Replays recorded delay events (or generated traffic) through the same
+decision pipeline as POST /event/delay, against isolated StateStore
+instances, and reports decision outcomes and throughput for every
+(ML_RISK_THRESHOLD, MAX_REASSIGNMENTS) configuration in a grid.
+
+Usage:
+    python simulation.py --events events.jsonl --thresholds 0.5,0.6,0.7 --max-reassignments 1,2,3
+    python simulation.py --generate 100000 --orders 5000 --idle-drivers 50 --workers 4
+
+Event sources:
+    - JSONL, one DelayEvent payload per line
+    - JSON list of payloads, or a GET /state snapshot (its event_history is replayed)
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+from typing import Dict, List, Optional, Sequence
+
+from pydantic import ValidationError
+from fastapi import HTTPException
+
+from logistics_backend import (
+    DRIVER_STATUS_TO_CODE,
+    MAX_REASSIGNMENTS,
+    ML_RISK_THRESHOLD,
+    NO_DRIVER,
+    DelayEvent,
+    Driver,
+    DriverStatus,
+    Order,
+    OrderStatus,
+    RiskScorer,
+    StateStore,
+    StatsTracker,
+    build_risk_scorer,
+    heuristic_risk,
+    process_delay_event,
+)
+
+EVENT_FIELDS = ("order_id", "driver_id", "reason", "event_id")
+
+# Events after which a driver that lost an order becomes AVAILABLE again (None: never)
+DEFAULT_RELEASE_AFTER = 100
+
+GENERATED_REASONS = (
+    "Traffic",
+    "Heavy traffic on highway",
+    "Customer not available",
+    "Flat tire",
+    "Vehicle breakdown on the ring road, waiting for tow truck",
+    "Road closed due to accident, rerouting through industrial area",
+)
+
+
+class _NullWriter:
+    """Swallows the pipeline's per-event logging during a replay"""
+
+    def write(self, _text):
+        return 0
+
+    def flush(self):
+        pass
+
+
+# ============================================================================
+# EVENT SOURCES
+# ============================================================================
+
+def load_events(path: str) -> List[Dict]:
+    """
+    Load recorded delay events from JSONL, a JSON list, or a /state snapshot.
+
+    Args:
+        path: File to read
+
+    Returns:
+        List of raw event payloads (only DelayEvent fields are kept)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        if isinstance(document, list):
+            records = document
+        else:
+            records = document.get("event_history", [document])
+
+    return [{k: record[k] for k in EVENT_FIELDS if k in record} for record in records]
+
+
+def generate_events(count: int, orders: int, drivers: int, seed: int = 0, duplicate_rate: float = 0.01) -> List[Dict]:
+    """
+    Generate synthetic delay traffic. Each order is owned by one driver,
+    so events look like the same driver reporting repeated delays.
+
+    Args:
+        count: Number of events
+        orders: Number of distinct orders
+        drivers: Number of distinct reporting drivers
+        seed: RNG seed for reproducible traffic
+        duplicate_rate: Fraction of events re-sent with an already used event_id
+
+    Returns:
+        List of raw event payloads
+    """
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        if events and rng.random() < duplicate_rate:
+            events.append(dict(rng.choice(events)))
+            continue
+        order = rng.randrange(orders)
+        events.append({
+            "order_id": f"ORD-{order + 1:06d}",
+            "driver_id": f"DRV-{order % drivers + 1:04d}",
+            "reason": rng.choice(GENERATED_REASONS),
+            "event_id": f"SIM-{i:08d}"
+        })
+    return events
+
+
+# ============================================================================
+# ISOLATED REPLAY
+# ============================================================================
+
+def seed_store(events: Sequence[DelayEvent], idle_drivers: int = 0) -> StateStore:
+    """
+    Build an isolated StateStore holding every order and driver the events
+    reference. Each order starts assigned to the first driver that reports
+    it (that driver becomes BUSY, as with POST /orders); idle_drivers extra
+    AVAILABLE drivers form the reassignment pool.
+    """
+    store = StateStore()
+    for event in events:
+        if event.driver_id not in store.drivers:
+            store.drivers.add(Driver(id=event.driver_id, name=event.driver_id))
+        if event.order_id not in store.orders:
+            store.orders.add(Order(id=event.order_id, status=OrderStatus.ACTIVE, assigned_driver_id=event.driver_id))
+            store.drivers.set_status(store.drivers.row(event.driver_id), DriverStatus.BUSY)
+    for i in range(idle_drivers):
+        driver_id = f"SIM-IDLE-{i + 1:04d}"
+        store.drivers.add(Driver(id=driver_id, name=driver_id))
+    return store
+
+
+class DriverReleases:
+    """
+    Models drivers finishing up after an order leaves them (reassigned away
+    or cancelled): the driver becomes AVAILABLE again after `after` further
+    events, unless another order was reassigned to it in the meantime.
+    Replays have no delivery completion, so this stands in for it; without
+    it the idle pool only ever shrinks and every configuration saturates.
+    """
+
+    def __init__(self, store: StateStore, after: Optional[int]):
+        self.store = store
+        self.after = after
+        self.pending = deque()  # (due event index, driver row, queued at event index)
+        self.assigned_at: Dict[int, int] = {}  # driver row -> event index of its latest reassigned order
+        self.released = 0
+
+    def order_left(self, index: int, driver_row: int):
+        if self.after is not None and driver_row != NO_DRIVER:
+            self.pending.append((index + self.after + 1, driver_row, index))
+
+    def order_assigned(self, index: int, driver_row: int):
+        self.assigned_at[driver_row] = index
+
+    def release_due(self, index: int):
+        """Free every driver whose release is due before event index"""
+        drivers = self.store.drivers
+        while self.pending and self.pending[0][0] <= index:
+            _, driver_row, queued_at = self.pending.popleft()
+            if self.assigned_at.get(driver_row, -1) > queued_at:
+                continue
+            if drivers.get_status(driver_row) != DriverStatus.AVAILABLE:
+                drivers.set_status(driver_row, DriverStatus.AVAILABLE)
+                self.released += 1
+
+
+def prescore(events: Sequence[DelayEvent], scorer: RiskScorer) -> List[float]:
+    """
+    Score every event in one score_batch call, so the replay measures the
+    decision pipeline rather than one scorer round trip per event. Each
+    event gets its own score (repeated events are scored again, as live).
+
+    Returns:
+        One risk per event, in order
+    """
+    risks = scorer.score_batch([(e.order_id, e.driver_id, e.reason) for e in events])
+    if len(risks) != len(events):
+        raise RuntimeError(f"Scorer '{scorer.name}' returned {len(risks)} scores for {len(events)} events")
+    return risks
+
+
+def run_config(
+    raw_events: List[Dict],
+    risk_threshold: float = ML_RISK_THRESHOLD,
+    max_reassignments: int = MAX_REASSIGNMENTS,
+    idle_drivers: int = 0,
+    seed: int = 0,
+    scorer: str = "heuristic",
+    release_after: Optional[int] = DEFAULT_RELEASE_AFTER
+) -> Dict:
+    """
+    Replay events for one configuration against a fresh StateStore.
+    Drivers that lose an order are freed again after release_after events
+    (see DriverReleases); available_drivers_left shows whether the idle
+    pool, rather than the configuration, limited reassignments.
+    With the default "heuristic" scorer, risk comes from the local heuristic
+    with a seeded RNG, so every configuration in a grid sees the same risk
+    sequence. Any ML_SCORER_MODE value (http, inprocess, pool) uses that
+    scorer instead, batch-scored up front (see prescore); scorer_fallbacks
+    counts events that got the unseeded heuristic because the scorer failed.
+
+    Returns:
+        Decision outcomes and throughput for the configuration
+    """
+    events = []
+    invalid = 0
+    for raw in raw_events:
+        try:
+            events.append(DelayEvent(**raw))
+        except ValidationError:
+            invalid += 1
+
+    store = seed_store(events, idle_drivers=idle_drivers)
+    risks = None
+    scoring_elapsed = 0.0
+    fallbacks = 0
+    rng = random.Random(seed)
+    score_risk = lambda order_id, driver_id, reason: heuristic_risk(reason, rng)
+    if scorer != "heuristic":
+        with redirect_stdout(_NullWriter()):
+            risk_scorer = build_risk_scorer(scorer)
+        if risk_scorer.name != scorer:
+            raise RuntimeError(f"Scorer '{scorer}' is unavailable (got '{risk_scorer.name}')")
+        start = time.perf_counter()
+        try:
+            with redirect_stdout(_NullWriter()):
+                risks = prescore(events, risk_scorer)
+        finally:
+            risk_scorer.close()
+        scoring_elapsed = time.perf_counter() - start
+        fallbacks = risk_scorer.fallbacks
+
+    orders = store.orders
+    releases = DriverReleases(store, release_after)
+    duplicates = rejected = 0
+    start = time.perf_counter()
+    with redirect_stdout(_NullWriter()):
+        for index, event in enumerate(events):
+            releases.release_due(index)
+            if risks is not None:
+                score_risk = lambda order_id, driver_id, reason, risk=risks[index]: risk
+            row = orders.index.get(event.order_id)
+            if row is not None:
+                previous_driver = orders.driver[row]
+                was_cancelled = orders.get_status(row) == OrderStatus.CANCELLED
+            try:
+                result = process_delay_event(
+                    event,
+                    store=store,
+                    score_risk=score_risk,
+                    risk_threshold=risk_threshold,
+                    max_reassignments=max_reassignments
+                )
+            except HTTPException:
+                rejected += 1
+                continue
+            if result["status"] != "success":
+                duplicates += 1
+                continue
+            current_driver = orders.driver[row]
+            if current_driver != previous_driver:
+                releases.order_left(index, previous_driver)
+                releases.order_assigned(index, current_driver)
+            elif not was_cancelled and orders.get_status(row) == OrderStatus.CANCELLED:
+                releases.order_left(index, current_driver)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "risk_threshold": risk_threshold,
+        "max_reassignments": max_reassignments,
+        "scorer": scorer,
+        "events": len(raw_events),
+        "invalid": invalid,
+        "duplicates": duplicates,
+        "rejected": rejected,
+        "outcomes": StatsTracker.summarize(store.stats.totals),
+        "final_orders": {s.value: n for s, n in store.orders.count_by_status().items()},
+        "release_after": release_after,
+        "drivers_released": releases.released,
+        "available_drivers_left": store.drivers.status_counts[DRIVER_STATUS_TO_CODE[DriverStatus.AVAILABLE]],
+        "scorer_fallbacks": fallbacks,
+        "scoring_s": scoring_elapsed,
+        "elapsed_s": elapsed,
+        "events_per_s": len(events) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def _run_grid_point(params, raw_events, idle_drivers, seed, scorer, release_after) -> Dict:
+    risk_threshold, max_reassignments = params
+    return run_config(raw_events, risk_threshold, max_reassignments, idle_drivers, seed, scorer, release_after)
+
+
+def run_grid(
+    raw_events: List[Dict],
+    thresholds: Sequence[float],
+    max_reassignments: Sequence[int],
+    idle_drivers: int = 0,
+    seed: int = 0,
+    workers: int = 1,
+    scorer: str = "heuristic",
+    release_after: Optional[int] = DEFAULT_RELEASE_AFTER
+) -> List[Dict]:
+    """
+    Run every (threshold, max_reassignments) combination.
+    With workers > 1 the configurations run in parallel in a process pool.
+    """
+    grid = [(t, m) for t in thresholds for m in max_reassignments]
+    run = partial(
+        _run_grid_point,
+        raw_events=raw_events,
+        idle_drivers=idle_drivers,
+        seed=seed,
+        scorer=scorer,
+        release_after=release_after
+    )
+    if workers <= 1 or len(grid) == 1:
+        return [run(params) for params in grid]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, grid))
+
+
+# ============================================================================
+# REPORTING & CLI
+# ============================================================================
+
+def print_report(results: List[Dict]):
+    header = (
+        f"{'threshold':>9} {'max_re':>6} {'events':>8} {'reassigned':>10} {'failed':>7} "
+        f"{'maintained':>10} {'cancelled':>9} {'reassign%':>9} {'avg_risk':>8} {'released':>8} {'idle_left':>9} "
+        f"{'events/s':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        o = r["outcomes"]
+        print(
+            f"{r['risk_threshold']:>9.2f} {r['max_reassignments']:>6} {o['events']:>8} {o['reassigned']:>10} "
+            f"{o['reassign_failed']:>7} {o['maintained']:>10} {o['cancelled']:>9} "
+            f"{o['reassignment_rate'] * 100:>8.1f}% {o['avg_risk']:>8.3f} {r['drivers_released']:>8} "
+            f"{r['available_drivers_left']:>9} {r['events_per_s']:>10.0f}"
+        )
+    for r in results:
+        if r["scorer_fallbacks"]:
+            print(
+                f"WARNING: threshold {r['risk_threshold']:.2f} / max_re {r['max_reassignments']}: "
+                f"{r['scorer_fallbacks']} scores came from the heuristic fallback, not the '{r['scorer']}' scorer"
+            )
+
+
+def _parse_list(value: str, cast) -> List:
+    return [cast(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay delay events against isolated state stores")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--events", help="Recorded events (JSONL, JSON list or /state snapshot)")
+    source.add_argument("--generate", type=int, metavar="N", help="Generate N synthetic events")
+    parser.add_argument("--orders", type=int, default=1000, help="Distinct orders for generated traffic")
+    parser.add_argument("--drivers", type=int, default=100, help="Distinct reporting drivers for generated traffic")
+    parser.add_argument("--idle-drivers", type=int, default=10, help="Extra AVAILABLE drivers to reassign to")
+    parser.add_argument("--thresholds", default=str(ML_RISK_THRESHOLD), help="Comma-separated risk thresholds")
+    parser.add_argument("--max-reassignments", default=str(MAX_REASSIGNMENTS), help="Comma-separated limits")
+    parser.add_argument(
+        "--release-after",
+        type=int,
+        default=DEFAULT_RELEASE_AFTER,
+        help="Events until a driver that lost an order is AVAILABLE again (-1: never)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size for the grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scorer",
+        default="heuristic",
+        choices=("heuristic", "http", "inprocess", "pool"),
+        help="Risk scorer (heuristic is seeded and identical across the grid)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.events:
+        raw_events = load_events(args.events)
+    else:
+        raw_events = generate_events(args.generate, args.orders, args.drivers, seed=args.seed)
+
+    results = run_grid(
+        raw_events,
+        _parse_list(args.thresholds, float),
+        _parse_list(args.max_reassignments, int),
+        idle_drivers=args.idle_drivers,
+        seed=args.seed,
+        workers=args.workers,
+        scorer=args.scorer,
+        release_after=None if args.release_after < 0 else args.release_after
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
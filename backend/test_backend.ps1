@@ -91,6 +91,56 @@ try {
     Write-Host "✅ Error properly caught: 400 Bad Request (Order not found)`n" -ForegroundColor Green
 }
 
+# Test 11: Aggregate Stats
+Write-Host "TEST 11: Aggregate Stats (GET /stats)" -ForegroundColor Yellow
+$stats = Invoke-RestMethod -Uri "http://localhost:8000/stats"
+Write-Host "✅ Orders: $($stats.orders.total) | Events: $($stats.events.totals.events) | Reassignment rate: $($stats.events.totals.reassignment_rate.ToString('0.00')) | Last 1m: $($stats.events.windows.'1m'.events)`n" -ForegroundColor Green
+
+# Test 12: Telemetry Ingestion + Track
+Write-Host "TEST 12: Telemetry Ingestion (POST /telemetry, GET /drivers/{id}/track)" -ForegroundColor Yellow
+$telemetry = @{
+    pings = @(
+        @{ driver_id = "DRV-TEST-001"; latitude = 17.385; longitude = 78.486; timestamp = 1700000000 },
+        @{ driver_id = "DRV-TEST-001"; latitude = 17.386; longitude = 78.487; timestamp = 1700000005 },
+        @{ driver_id = "DRV-UNKNOWN-999"; latitude = 0; longitude = 0 }
+    )
+} | ConvertTo-Json -Depth 3
+
+$ingested = Invoke-RestMethod -Uri "http://localhost:8000/telemetry" -Method POST -Body $telemetry -ContentType "application/json"
+Start-Sleep -Seconds 1  # Positions are applied by the periodic flush
+$track = Invoke-RestMethod -Uri "http://localhost:8000/drivers/DRV-TEST-001/track"
+Write-Host "✅ Accepted: $($ingested.accepted) | Rejected: $($ingested.rejected) | Track points: $($track.positions.Count)`n" -ForegroundColor Green
+
+# Test 13: Filtered Orders + Cursor Paging
+Write-Host "TEST 13: Order Filters & Cursor Paging (GET /orders?status=&limit=&cursor=)" -ForegroundColor Yellow
+$page1 = Invoke-RestMethod -Uri "http://localhost:8000/orders?status=ACTIVE&limit=1&fields=id,status"
+$page1Ids = @($page1.orders.PSObject.Properties.Name)
+Write-Host "✅ Page 1: $($page1Ids -join ', ') | next_cursor: $($page1.next_cursor)" -ForegroundColor Green
+if ($page1.next_cursor) {
+    $cursor = [uri]::EscapeDataString($page1.next_cursor)
+    $page2 = Invoke-RestMethod -Uri "http://localhost:8000/orders?status=ACTIVE&limit=1&fields=id,status&cursor=$cursor"
+    $page2Ids = @($page2.orders.PSObject.Properties.Name)
+    Write-Host "✅ Page 2: $($page2Ids -join ', ') | Overlap with page 1: $(@($page2Ids | Where-Object { $page1Ids -contains $_ }).Count)`n" -ForegroundColor Green
+} else {
+    Write-Host "✅ Single page (only one ACTIVE order)`n" -ForegroundColor Green
+}
+
+# Test 14: ML Batch Rules (ML service on port 8001)
+Write-Host "TEST 14: ML Batch Prediction (POST :8001/predict-reassign/batch)" -ForegroundColor Yellow
+$deliveries = @{
+    deliveries = @(
+        @{ distance_km = 12.5; delay_minutes = 45; issue_type = "vehicle_breakdown" },
+        @{ distance_km = 3.0; delay_minutes = 5; issue_type = "traffic" }
+    )
+} | ConvertTo-Json -Depth 3
+
+try {
+    $batch = Invoke-RestMethod -Uri "http://localhost:8001/predict-reassign/batch" -Method POST -Body $deliveries -ContentType "application/json"
+    Write-Host "✅ Reassign: $(($batch.predictions | ForEach-Object { $_.reassign }) -join ', ') | Reasons: $(($batch.predictions | ForEach-Object { $_.reason }) -join ', ')`n" -ForegroundColor Green
+} catch {
+    Write-Host "⚠️ ML service not running on port 8001 (python ml_service/main.py)`n" -ForegroundColor Yellow
+}
+
 Write-Host "🎉 ALL TESTS COMPLETED SUCCESSFULLY!`n" -ForegroundColor Cyan
 Write-Host "📊 Summary:" -ForegroundColor White
 Write-Host "   - Thread-safe operations: ✅" -ForegroundColor Green
@@ -98,4 +148,5 @@ Write-Host "   - CRUD endpoints: ✅" -ForegroundColor Green
 Write-Host "   - Delay event processing: ✅" -ForegroundColor Green
 Write-Host "   - Idempotency: ✅" -ForegroundColor Green
 Write-Host "   - Error handling: ✅" -ForegroundColor Green
+Write-Host "   - Stats, telemetry & cursor paging: ✅" -ForegroundColor Green
 Write-Host "`nView detailed API docs at: http://localhost:8000/docs" -ForegroundColor White
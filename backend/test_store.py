@@ -0,0 +1,247 @@
+"""
+Column store checks: indexed order queries and cursor paging against a
+brute-force filter, rolling stats window expiry, and telemetry ordering.
+
+Usage:
+    python -m pytest backend
+"""
+
+import random
+
+import pytest
+
+from logistics_backend import (
+    NO_DRIVER,
+    STAT_METRICS,
+    Driver,
+    DriverStatus,
+    DriverTable,
+    Order,
+    OrderStatus,
+    OrderTable,
+    PositionRing,
+    RollingWindow,
+    StateStore,
+    StatsTracker,
+    TelemetryBuffer,
+    TelemetryPing,
+    decode_cursor,
+    encode_cursor,
+    epoch_to_iso,
+)
+
+BASE = 1_700_000_000.0
+STATUSES = list(OrderStatus)
+
+
+def build_tables(rng, orders=300, drivers=6, distinct_times=25):
+    """Random tables; few distinct created_at values so ties are common"""
+    driver_table = DriverTable()
+    for d in range(drivers):
+        driver_table.add(Driver(id=f"DRV-{d}", name=f"Driver {d}", status=DriverStatus.AVAILABLE))
+    order_table = OrderTable(driver_table)
+    for o in range(orders):
+        driver = rng.randrange(-1, drivers)
+        order_table.add(Order(
+            id=f"ORD-{o}",
+            status=rng.choice(STATUSES),
+            assigned_driver_id=None if driver < 0 else f"DRV-{driver}",
+            created_at=epoch_to_iso(BASE + rng.randrange(distinct_times))
+        ))
+    return driver_table, order_table
+
+
+def mutate(rng, orders, drivers, steps=200):
+    """Status changes and reassignments, which move rows between indexes"""
+    for _ in range(steps):
+        row = rng.randrange(len(orders))
+        if rng.random() < 0.5:
+            orders.set_status(row, rng.choice(STATUSES))
+        else:
+            orders.reassign(row, rng.randrange(len(drivers)))
+
+
+def brute_force(orders, status=None, driver_row=None, created_from=None, created_to=None, after=None):
+    rows = [
+        row for row in range(len(orders))
+        if (status is None or orders.get_status(row) == status)
+        and (driver_row is None or orders.driver[row] == driver_row)
+        and (created_from is None or orders.created_at[row] >= created_from)
+        and (created_to is None or orders.created_at[row] < created_to)
+        and (after is None or (orders.created_at[row], row) > after)
+    ]
+    return sorted(rows, key=lambda row: (orders.created_at[row], row))
+
+
+def random_filters(rng, drivers):
+    filters = {}
+    if rng.random() < 0.5:
+        filters["status"] = rng.choice(STATUSES)
+    if rng.random() < 0.5:
+        filters["driver_row"] = rng.randrange(len(drivers))
+    if rng.random() < 0.4:
+        filters["created_from"] = BASE + rng.randrange(-2, 27)
+    if rng.random() < 0.4:
+        filters["created_to"] = BASE + rng.randrange(-2, 27)
+    return filters
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_query_matches_brute_force(seed):
+    rng = random.Random(seed)
+    drivers, orders = build_tables(rng)
+    for _ in range(10):
+        mutate(rng, orders, drivers, steps=30)
+        filters = random_filters(rng, drivers)
+        assert orders.query(**filters) == brute_force(orders, **filters)
+
+        # Cursor at an arbitrary (possibly absent) key, including mid-tie rows
+        after = (BASE + rng.randrange(-1, 26), rng.randrange(-1, len(orders) + 1))
+        assert orders.query(after=after, **filters) == brute_force(orders, after=after, **filters)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cursor_paging_covers_every_row_once(seed):
+    rng = random.Random(seed)
+    drivers, orders = build_tables(rng, distinct_times=5)
+    mutate(rng, orders, drivers)
+    filters = random_filters(rng, drivers)
+    limit = rng.randrange(1, 12)
+
+    paged, after = [], None
+    while True:
+        page = orders.query(after=after, limit=limit, **filters)
+        assert len(page) <= limit
+        paged.extend(page)
+        assert len(paged) <= len(orders), "cursor did not advance"
+        if len(page) < limit:
+            break
+        # Round-trip through the opaque cursor the API hands out
+        after = decode_cursor(encode_cursor(orders.created_at[page[-1]], page[-1]))
+    assert paged == brute_force(orders, **filters)
+
+
+def test_cursor_paging_within_one_timestamp():
+    drivers = DriverTable()
+    orders = OrderTable(drivers)
+    for o in range(7):
+        orders.add(Order(id=f"ORD-{o}", created_at=epoch_to_iso(BASE)))
+    pages, after = [], None
+    while True:
+        page = orders.query(after=after, limit=3)
+        if not page:
+            break
+        pages.append(page)
+        assert len(pages) <= 7, "cursor did not advance"
+        after = (orders.created_at[page[-1]], page[-1])
+    assert pages == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_query_unassigned_driver_has_no_index():
+    drivers, orders = build_tables(random.Random(0), drivers=3)
+    unused = drivers.add(Driver(id="DRV-NEW", name="New"))
+    assert orders.query(driver_row=unused) == []
+    assert orders.query(status=OrderStatus.ACTIVE, driver_row=unused) == []
+    assert NO_DRIVER not in orders.by_driver
+
+
+def window_value(window, metric):
+    return window.totals[STAT_METRICS.index(metric)]
+
+
+def test_rolling_window_expiry():
+    window = RollingWindow(5)
+    events = STAT_METRICS.index("events")
+    for second in range(100, 105):
+        window.add(second, events, 1.0)
+    assert window_value(window, "events") == 5
+
+    window.advance(105)  # second 100 falls out
+    assert window_value(window, "events") == 4
+    window.add(107, events, 1.0)  # 101 and 102 fall out, 107 counted
+    assert window_value(window, "events") == 3
+    window.advance(107)  # no time passed
+    assert window_value(window, "events") == 3
+    window.advance(111)  # only 107 remains
+    assert window_value(window, "events") == 1
+    window.advance(112)
+    assert window_value(window, "events") == 0
+    window.add(1000, events, 2.0)  # gap longer than the window
+    assert window_value(window, "events") == 2
+
+
+def test_rolling_window_late_sample_counts_in_newest_bucket():
+    window = RollingWindow(3)
+    events = STAT_METRICS.index("events")
+    window.add(50, events, 1.0)
+    window.add(48, events, 1.0)
+    window.advance(52)
+    assert window_value(window, "events") == 2
+    window.advance(53)
+    assert window_value(window, "events") == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rolling_window_matches_brute_force(seed):
+    rng = random.Random(seed)
+    window = RollingWindow(10)
+    events = STAT_METRICS.index("events")
+    samples, now = [], 0
+    for _ in range(500):
+        now += rng.choice((0, 0, 1, 1, 2, 7, 15))
+        window.add(now, events, 1.0)
+        samples.append(now)
+        assert window_value(window, "events") == sum(1 for s in samples if s > now - 10)
+
+
+def test_stats_tracker_windows():
+    stats = StatsTracker()
+    stats.record_decision("REASSIGNMENT_INITIATED", 0.9, cancelled=False, now=BASE)
+    stats.record_decision("MAINTAIN_ASSIGNMENT", 0.3, cancelled=False, now=BASE + 30)
+    stats.record_decision("REASSIGNMENT_FAILED", 1.0, cancelled=True, now=BASE + 90)
+
+    snapshot = stats.snapshot(now=BASE + 90)
+    assert snapshot["totals"]["events"] == 3
+    assert snapshot["totals"]["cancelled"] == 1
+    assert snapshot["totals"]["reassignment_rate"] == pytest.approx(1 / 3)
+    assert snapshot["windows"]["1m"]["events"] == 1
+    assert snapshot["windows"]["5m"]["events"] == 3
+    assert snapshot["windows"]["5m"]["avg_risk"] == pytest.approx(2.2 / 3)
+
+    later = stats.snapshot(now=BASE + 400)
+    assert later["windows"]["5m"]["events"] == 0
+    assert later["windows"]["5m"]["avg_risk"] == 0.0
+    assert later["windows"]["1h"]["events"] == 3
+    assert later["totals"]["events"] == 3
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_position_ring_keeps_newest_in_time_order(seed):
+    rng = random.Random(seed)
+    ring = PositionRing(8)
+    timestamps = []
+    for _ in range(100):
+        timestamp = BASE + rng.randrange(60)
+        ring.append(timestamp, 1.0, 2.0)
+        timestamps.append(timestamp)
+    kept = [ring.samples[((ring.next - ring.count + k) % ring.size) * 3] for k in range(ring.count)]
+    assert kept == sorted(timestamps)[-8:]
+
+
+def test_telemetry_flush_skips_stale_pings():
+    store = StateStore()
+    row = store.drivers.add(Driver(id="DRV-1", name="One"))
+    telemetry = TelemetryBuffer(history_size=4)
+
+    ping = lambda t, lat: TelemetryPing(driver_id="DRV-1", latitude=lat, longitude=0.0, timestamp=BASE + t)
+    assert telemetry.ingest([ping(10, 1.0), ping(5, 2.0)], store.drivers) == 2
+    assert telemetry.ingest([TelemetryPing(driver_id="DRV-X", latitude=0, longitude=0)], store.drivers) == 0
+    assert telemetry.flush(store) == 1
+    assert store.drivers.last_ping[row] == BASE + 10  # Coalesced to the newest ping
+
+    telemetry.ingest([ping(7, 3.0)], store.drivers)  # Arrives after the flush, but older
+    assert telemetry.flush(store) == 0
+    assert store.drivers.last_ping[row] == BASE + 10
+    assert [p["latitude"] for p in telemetry.track("DRV-1")] == [2.0, 3.0, 1.0]
+    stats = telemetry.stats()
+    assert (stats["received"], stats["coalesced"], stats["rejected"], stats["applied"], stats["stale"]) == (3, 1, 1, 1, 1)
@@ -1,6 +1,13 @@
+import json
+import math
+import operator
+import os
+import threading
+from typing import Dict, List
 from fastapi import FastAPI
 from pydantic import BaseModel
 from random import uniform
+import numpy as np
 
 app = FastAPI()
 
@@ -10,36 +17,219 @@ class DeliveryData(BaseModel):
     issue_type: str
 
 
+class DeliveryBatch(BaseModel):
+    deliveries: List[DeliveryData]
+
+
 class RiskRequest(BaseModel):
     order_id: str
     driver_id: str
     reason: str
 
+
+class RiskBatchRequest(BaseModel):
+    requests: List[RiskRequest]
+
+
+def score_risk(order_id: str, driver_id: str, reason: str) -> float:
+    """
+    Risk score (0.0 - 1.0) for a delay event. Shared by the HTTP endpoints
+    and by the backend's in-process scoring mode.
+    """
+    reason = reason or ""
+    base_risk = len(reason) / 100.0
+    ml_noise = uniform(0.0, 0.3)
+    return min(1.0, base_risk + ml_noise)
+
+# Declarative reassignment rules (see rules.json), compiled to vectorized predicates
+RULES_PATH = os.getenv("RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json"))
+
+RULE_FIELDS = {"distance_km": float, "delay_minutes": float, "issue_type": str}
+RULE_OPS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "lt": operator.lt,
+    "le": operator.le,
+    "in": np.isin,
+}
+
+
+def is_rule_value(value, kind: type) -> bool:
+    """Strict JSON type check: no None, no bools as numbers, no NaN/inf"""
+    if kind is str:
+        return isinstance(value, str)
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def compile_condition(condition: Dict):
+    """Turn {"field", "op", "value"} into a columns -> bool-array predicate"""
+    if not isinstance(condition, dict):
+        raise ValueError(f"Rule condition must be an object, got {type(condition).__name__}")
+    field, op, value = condition.get("field"), condition.get("op"), condition.get("value")
+    if field not in RULE_FIELDS:
+        raise ValueError(f"Unknown rule field '{field}'. Allowed: {list(RULE_FIELDS)}")
+    if op not in RULE_OPS:
+        raise ValueError(f"Unknown rule op '{op}'. Allowed: {list(RULE_OPS)}")
+    if op == "in" and not isinstance(value, list):
+        raise ValueError(f"Rule op 'in' on '{field}' needs a list value")
+    if op != "in" and isinstance(value, (list, dict)):
+        raise ValueError(f"Rule op '{op}' on '{field}' needs a scalar value")
+    kind = RULE_FIELDS[field]
+    for v in (value if op == "in" else [value]):
+        if not is_rule_value(v, kind):
+            raise ValueError(f"Rule value {v!r} is not a valid {kind.__name__} for '{field}'")
+    value = [kind(v) for v in value] if op == "in" else kind(value)
+    compare = RULE_OPS[op]
+    return lambda columns: compare(columns[field], value)
+
+
+class CompiledRules:
+    """
+    Rules table compiled for column-at-a-time evaluation.
+    The first matching rule wins; rows matching nothing get the default.
+    """
+
+    def __init__(self, table: Dict):
+        self.validate(table)
+        self.table = table
+        rules = table.get("rules", [])
+        default = table["default"]
+        self.names = [rule.get("name", f"rule_{i}") for i, rule in enumerate(rules)] + ["default"]
+        self.predicates = [[compile_condition(c) for c in rule.get("when", [])] for rule in rules]
+        outcomes = rules + [default]
+        self.reassign = np.array([o["reassign"] for o in outcomes], dtype=bool)
+        self.delay_offset = np.array([float(o.get("delay_offset", 0)) for o in outcomes])
+        self.reasons = [o["reason"] for o in outcomes]
+
+    @staticmethod
+    def validate(table: Dict):
+        """Reject tables that would fail compilation or serve bad outcomes; raises ValueError"""
+        if not isinstance(table, dict):
+            raise ValueError("Rules table must be an object")
+        rules = table.get("rules", [])
+        if not isinstance(rules, list):
+            raise ValueError("'rules' must be a list")
+        if not isinstance(table.get("default"), dict):
+            raise ValueError("'default' must be an object")
+        for i, outcome in enumerate(rules + [table["default"]]):
+            label = "default" if i == len(rules) else f"rules[{i}]"
+            if not isinstance(outcome, dict):
+                raise ValueError(f"{label} must be an object")
+            if not isinstance(outcome.get("reassign"), bool):
+                raise ValueError(f"{label}.reassign must be true or false")
+            if not isinstance(outcome.get("reason"), str):
+                raise ValueError(f"{label}.reason must be a string")
+            if not is_rule_value(outcome.get("delay_offset", 0), float):
+                raise ValueError(f"{label}.delay_offset must be a finite number")
+            if not isinstance(outcome.get("name", ""), str):
+                raise ValueError(f"{label}.name must be a string")
+            if not isinstance(outcome.get("when", []), list):
+                raise ValueError(f"{label}.when must be a list of conditions")
+
+    @classmethod
+    def from_file(cls, path: str) -> "CompiledRules":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Index of the winning rule (len(rules) = default) for every row"""
+        size = len(columns["delay_minutes"])
+        default = len(self.predicates)
+        matched = np.full(size, default, dtype=np.intp)
+        unmatched = np.ones(size, dtype=bool)
+        for index, predicates in enumerate(self.predicates):
+            mask = unmatched.copy()
+            for predicate in predicates:
+                mask &= predicate(columns)
+            matched[mask] = index
+            unmatched &= ~mask
+        return matched
+
+    def predict_columns(self, columns: Dict[str, np.ndarray]) -> List[Dict]:
+        matched = self.match(columns)
+        reassign = self.reassign[matched].tolist()
+        predicted_delay = (columns["delay_minutes"] + self.delay_offset[matched]).tolist()
+        reasons = [self.reasons[i] for i in matched.tolist()]
+        return [
+            {"reassign": r, "predicted_delay": d, "reason": why}
+            for r, d, why in zip(reassign, predicted_delay, reasons)
+        ]
+
+    def predict(self, deliveries: List[DeliveryData]) -> List[Dict]:
+        columns = {
+            "distance_km": np.fromiter((d.distance_km for d in deliveries), dtype=float, count=len(deliveries)),
+            "delay_minutes": np.fromiter((d.delay_minutes for d in deliveries), dtype=float, count=len(deliveries)),
+            # object dtype keeps strings exact; fixed-width str arrays drop trailing NULs
+            "issue_type": np.array([d.issue_type for d in deliveries], dtype=object),
+        }
+        return self.predict_columns(columns)
+
+
+class RuleEngine:
+    """
+    Holds the compiled rules and recompiles when the rules file changes on disk.
+    Rules load on first use, so importing this module never fails on a bad file.
+    A bad or missing file after a successful load keeps the previous rules.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.rules = None
+
+    def current(self) -> CompiledRules:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            if self.rules is None:
+                raise
+            print(f"⚠️ Rules file unavailable, keeping previous rules: {e}")
+            return self.rules
+        if mtime != self.mtime:
+            with self.lock:
+                if mtime != self.mtime:
+                    try:
+                        self.rules = CompiledRules.from_file(self.path)
+                        print(f"📐 Loaded {len(self.rules.names) - 1} reassignment rules from {self.path}")
+                    except OSError as e:
+                        # Mid-swap (file replaced or removed); retry on the next call
+                        if self.rules is None:
+                            raise
+                        print(f"⚠️ Rules file unavailable, keeping previous rules: {e}")
+                        return self.rules
+                    except (ValueError, KeyError) as e:
+                        if self.rules is None:
+                            raise
+                        print(f"⚠️ Invalid rules file, keeping previous rules: {e}")
+                    self.mtime = mtime
+        return self.rules
+
+
+rule_engine = RuleEngine(RULES_PATH)
+
+
 @app.get("/")
 def root():
     return {"status": "ML service running"}
 
 @app.post("/predict-reassign")
 def predict(data: DeliveryData):
-    if data.issue_type == "vehicle_breakdown":
-        return {
-            "reassign": True,
-            "predicted_delay": data.delay_minutes + 30,
-            "reason": "Vehicle breakdown"
-        }
+    return rule_engine.current().predict([data])[0]
 
-    if data.delay_minutes > 20:
-        return {
-            "reassign": True,
-            "predicted_delay": data.delay_minutes,
-            "reason": "High delay"
-        }
 
-    return {
-        "reassign": False,
-        "predicted_delay": data.delay_minutes,
-        "reason": "Delay acceptable"
-    }
+@app.post("/predict-reassign/batch")
+def predict_batch(batch: DeliveryBatch):
+    """Evaluate the rules table over many deliveries at once, in request order."""
+    return {"predictions": rule_engine.current().predict(batch.deliveries)}
+
+
+@app.get("/rules")
+def get_rules():
+    """Currently loaded rules, in evaluation order."""
+    return rule_engine.current().table
 
 
 @app.post("/predict-risk")
@@ -49,11 +239,15 @@ def predict_risk(req: RiskRequest):
     This mirrors the lightweight heuristic used in the backend demo but
     exposes it as a separate ML microservice endpoint for integration.
     """
-    reason = req.reason or ""
-    base_risk = len(reason) / 100.0
-    ml_noise = uniform(0.0, 0.3)
-    risk_score = min(1.0, base_risk + ml_noise)
-    return {"risk_score": risk_score}
+    return {"risk_score": score_risk(req.order_id, req.driver_id, req.reason)}
+
+
+@app.post("/predict-risk/batch")
+def predict_risk_batch(batch: RiskBatchRequest):
+    """Score many delay events in one round trip, in request order."""
+    return {
+        "risk_scores": [score_risk(r.order_id, r.driver_id, r.reason) for r in batch.requests]
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+"""
+Rules engine checks: the shipped rules.json must reproduce the original
+hard-coded /predict-reassign logic, and bad edits must never replace good rules.
+
+Usage:
+    python -m pytest ml_service
+"""
+
+import copy
+import itertools
+import json
+import os
+
+import pytest
+
+from bench_rules import predict_scalar
+from main import RULES_PATH, CompiledRules, DeliveryData, RuleEngine
+
+ISSUE_TYPES = (
+    "vehicle_breakdown",
+    "vehicle_breakdown\u0000",
+    "vehicle_breakdown ",
+    "Vehicle_breakdown",
+    "traffic",
+    "",
+)
+DELAYS = (-1.0, 0.0, 19.999999, 20.0, 20.000001, 21.0, 1e9)
+DISTANCES = (0.0, 12.5)
+
+
+def load_table():
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_shipped_rules_match_scalar_reference():
+    deliveries = [
+        DeliveryData(distance_km=km, delay_minutes=delay, issue_type=issue)
+        for km, delay, issue in itertools.product(DISTANCES, DELAYS, ISSUE_TYPES)
+    ]
+    predicted = CompiledRules(load_table()).predict(deliveries)
+    assert predicted == [predict_scalar(d) for d in deliveries]
+
+
+def test_single_and_batch_agree():
+    rules = CompiledRules(load_table())
+    deliveries = [DeliveryData(distance_km=1, delay_minutes=d, issue_type="traffic") for d in DELAYS]
+    assert rules.predict(deliveries) == [rules.predict([d])[0] for d in deliveries]
+
+
+def test_in_operator():
+    table = {
+        "rules": [{
+            "when": [{"field": "issue_type", "op": "in", "value": ["weather", "traffic"]}],
+            "reassign": True,
+            "reason": "listed"
+        }],
+        "default": {"reassign": False, "reason": "other"}
+    }
+    deliveries = [
+        DeliveryData(distance_km=1, delay_minutes=1, issue_type=issue)
+        for issue in ("traffic", "traffic\u0000", "snow")
+    ]
+    assert [p["reason"] for p in CompiledRules(table).predict(deliveries)] == ["listed", "other", "other"]
+
+
+def _edit(path, value):
+    """Copy of the shipped table with one nested key replaced"""
+    table = copy.deepcopy(load_table())
+    target = table
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+    return table
+
+
+BAD_TABLES = {
+    "reassign string": _edit(["rules", 0, "reassign"], "false"),
+    "reassign number": _edit(["default", "reassign"], 0),
+    "delay_offset nan": _edit(["rules", 0, "delay_offset"], float("nan")),
+    "delay_offset inf": _edit(["rules", 0, "delay_offset"], float("inf")),
+    "delay_offset string": _edit(["rules", 0, "delay_offset"], "30"),
+    "reason missing": _edit(["default", "reason"], None),
+    "str value null": _edit(["rules", 0, "when", 0, "value"], None),
+    "str value number": _edit(["rules", 0, "when", 0, "value"], 5),
+    "float value null": _edit(["rules", 1, "when", 0, "value"], None),
+    "float value bool": _edit(["rules", 1, "when", 0, "value"], True),
+    "float value nan": _edit(["rules", 1, "when", 0, "value"], float("nan")),
+    "in scalar": _edit(["rules", 0, "when", 0], {"field": "issue_type", "op": "in", "value": "x"}),
+    "in with null": _edit(["rules", 0, "when", 0], {"field": "issue_type", "op": "in", "value": ["x", None]}),
+    "unknown op": _edit(["rules", 0, "when", 0, "op"], "like"),
+    "rule string": _edit(["rules", 0], "oops"),
+    "when object": _edit(["rules", 0, "when"], {"field": "issue_type", "op": "eq", "value": "x"}),
+    "default missing": _edit(["default"], None),
+    "rules object": _edit(["rules"], {}),
+}
+
+
+@pytest.mark.parametrize("name", sorted(BAD_TABLES))
+def test_bad_tables_rejected(name):
+    with pytest.raises(ValueError):
+        CompiledRules(BAD_TABLES[name])
+
+
+def test_engine_keeps_previous_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(load_table()), encoding="utf-8")
+    engine = RuleEngine(str(path))
+    good = engine.current()
+
+    for step, table in enumerate(BAD_TABLES.values(), start=1):
+        path.write_text(json.dumps(table), encoding="utf-8")
+        os.utime(path, ns=(step * 10**9, step * 10**9))
+        assert engine.current() is good
+
+    path.unlink()
+    assert engine.current() is good
+
+    edited = _edit(["rules", 1, "when", 0, "value"], 30)
+    path.write_text(json.dumps(edited), encoding="utf-8")
+    assert engine.current().table == edited
+
+
+def test_engine_first_load_raises(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(BAD_TABLES["reassign string"]), encoding="utf-8")
+    with pytest.raises(ValueError):
+        RuleEngine(str(path)).current()
+    with pytest.raises(OSError):
+        RuleEngine(str(tmp_path / "missing.json")).current()